@@ -0,0 +1,149 @@
+import datetime
+import hashlib
+import mmap
+import os
+import random
+import re
+import struct
+import threading
+from typing import Dict, Optional, Tuple
+
+from models import GameBoard
+
+DEFAULT_CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+# Each index entry is the little-endian uint64 byte offset of one board line
+INDEX_ENTRY = struct.Struct("<Q")
+
+# Mirrors the difficulty mapping used by the frontend: (num_chains, grid_size)
+DIFFICULTY_PRESETS: Dict[str, Tuple[int, int]] = {
+    "easy": (3, 10),
+    "medium": (5, 15),
+    "hard": (8, 20),
+}
+
+
+def corpus_name(language: str, language_level: str, difficulty: str) -> str:
+    """File stem for one (language, level, difficulty) corpus"""
+    parts = [language.lower(), language_level.upper(), difficulty.lower()]
+    return "_".join(re.sub(r"[^\w-]+", "-", part) for part in parts)
+
+
+class BoardCorpusWriter:
+    """Appends boards to a JSONL corpus and its fixed-width offset index"""
+
+    def __init__(self, directory: str, language: str, language_level: str, difficulty: str):
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, corpus_name(language, language_level, difficulty))
+        self._lock = threading.Lock()
+        self._data = open(stem + ".jsonl", "ab")
+        self._index = open(stem + ".idx", "ab")
+
+    def append(self, board: GameBoard) -> None:
+        line = board.model_dump_json().encode("utf-8") + b"\n"
+        with self._lock:
+            offset = self._data.seek(0, os.SEEK_END)
+            self._data.write(line)
+            self._data.flush()
+            # The index entry goes last so readers never see a half-written board
+            self._index.write(INDEX_ENTRY.pack(offset))
+            self._index.flush()
+
+    def close(self) -> None:
+        self._data.close()
+        self._index.close()
+
+
+class _MappedCorpus:
+    """Memory-mapped view of one corpus file pair"""
+
+    def __init__(self, stem: str):
+        self.stem = stem
+        self.index_size = -1
+        self.count = 0
+        self.data: Optional[mmap.mmap] = None
+        self.index: Optional[mmap.mmap] = None
+
+    def refresh(self) -> None:
+        """Remap when the builder has appended boards since the last lookup"""
+        index_size = os.path.getsize(self.stem + ".idx")
+        if index_size == self.index_size:
+            return
+
+        self.close()
+        self.index_size = index_size
+        self.count = index_size // INDEX_ENTRY.size
+        if self.count == 0:
+            return
+        with open(self.stem + ".jsonl", "rb") as data_file, open(self.stem + ".idx", "rb") as index_file:
+            self.data = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.index = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def get(self, position: int) -> bytes:
+        (start,) = INDEX_ENTRY.unpack_from(self.index, position * INDEX_ENTRY.size)
+        if position + 1 < self.count:
+            (end,) = INDEX_ENTRY.unpack_from(self.index, (position + 1) * INDEX_ENTRY.size)
+        else:
+            end = self.data.find(b"\n", start)
+        return self.data[start:end].rstrip(b"\n")
+
+    def close(self) -> None:
+        if self.data is not None:
+            self.data.close()
+            self.index.close()
+        self.data = None
+        self.index = None
+
+
+class BoardCorpus:
+    """Read-only access to pre-generated boards without loading them into RAM.
+
+    Lookups read one index entry and slice one line out of the mmap, so they
+    are O(1) regardless of corpus size. Boards are returned as raw JSON bytes
+    so they can be sent to the client without re-parsing.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.getenv("BOARD_CORPUS_DIR", DEFAULT_CORPUS_DIR)
+        self._lock = threading.Lock()
+        self._corpora: Dict[str, _MappedCorpus] = {}
+
+    def _open(self, language: str, language_level: str, difficulty: str) -> Optional[_MappedCorpus]:
+        name = corpus_name(language, language_level, difficulty)
+        corpus = self._corpora.get(name)
+        if corpus is None:
+            stem = os.path.join(self.directory, name)
+            if not os.path.exists(stem + ".idx"):
+                return None
+            corpus = self._corpora.setdefault(name, _MappedCorpus(stem))
+        corpus.refresh()
+        return corpus if corpus.count else None
+
+    def count(self, language: str, language_level: str, difficulty: str) -> int:
+        with self._lock:
+            corpus = self._open(language, language_level, difficulty)
+            return corpus.count if corpus else 0
+
+    def get(self, language: str, language_level: str, difficulty: str, position: int) -> Optional[bytes]:
+        """Board JSON at position (wrapped around the corpus size)"""
+        with self._lock:
+            corpus = self._open(language, language_level, difficulty)
+            if corpus is None:
+                return None
+            return corpus.get(position % corpus.count)
+
+    def random_board(self, language: str, language_level: str, difficulty: str) -> Optional[bytes]:
+        return self.get(language, language_level, difficulty, random.getrandbits(63))
+
+    def daily_board(
+        self,
+        language: str,
+        language_level: str,
+        difficulty: str,
+        date: Optional[datetime.date] = None
+    ) -> Optional[bytes]:
+        """Board of the day: every worker picks the same board for a given date"""
+        date = date or datetime.date.today()
+        seed = f"{date.isoformat()}:{corpus_name(language, language_level, difficulty)}"
+        position = int.from_bytes(hashlib.sha256(seed.encode("utf-8")).digest()[:8], "little")
+        return self.get(language, language_level, difficulty, position)
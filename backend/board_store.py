@@ -0,0 +1,50 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+from models import GameBoard
+from spatial_index import SpatialIndex
+
+# Most recently generated boards kept for viewport and gameplay requests
+BOARD_STORE_SIZE = int(os.getenv("BOARD_STORE_SIZE", "256"))
+
+
+class StoredBoard:
+    """A generated board together with its spatial index"""
+
+    __slots__ = ("board_id", "board", "index")
+
+    def __init__(self, board_id: str, board: GameBoard):
+        self.board_id = board_id
+        self.board = board
+        self.index = SpatialIndex(board)
+
+
+class BoardStore:
+    """In-process LRU of generated boards, addressed by board_id"""
+
+    def __init__(self, max_boards: int = BOARD_STORE_SIZE):
+        self.max_boards = max_boards
+        self._lock = threading.Lock()
+        self._boards: "OrderedDict[str, StoredBoard]" = OrderedDict()
+
+    def put(self, board: GameBoard) -> str:
+        """Store a board (tagging it with a new board_id) and return the ID"""
+        board_id = board.board_id or uuid.uuid4().hex
+        board.board_id = board_id
+        stored = StoredBoard(board_id, board)
+        with self._lock:
+            self._boards[board_id] = stored
+            self._boards.move_to_end(board_id)
+            while len(self._boards) > self.max_boards:
+                self._boards.popitem(last=False)
+        return board_id
+
+    def get(self, board_id: str) -> Optional[StoredBoard]:
+        with self._lock:
+            stored = self._boards.get(board_id)
+            if stored is not None:
+                self._boards.move_to_end(board_id)
+            return stored
@@ -0,0 +1,75 @@
+"""Build the offline board corpus served by /api/board/corpus.
+
+Example:
+    python build_corpus.py --languages English Spanish --levels A1 B1 --count 1000 --workers 16
+"""
+import argparse
+import itertools
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+from board_corpus import DEFAULT_CORPUS_DIR, DIFFICULTY_PRESETS, BoardCorpusWriter
+from game_logic import BoardGenerator
+from structured_logging import setup_logging
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate boards into the append-only board corpus")
+    parser.add_argument("--languages", nargs="+", default=["English"])
+    parser.add_argument("--levels", nargs="+", default=["B1"])
+    parser.add_argument("--difficulties", nargs="+", default=list(DIFFICULTY_PRESETS), choices=list(DIFFICULTY_PRESETS))
+    parser.add_argument("--count", type=int, default=100, help="Boards per language/level/difficulty")
+    parser.add_argument("--workers", type=int, default=8, help="Boards generated in parallel")
+    parser.add_argument("--use-templates", action="store_true")
+    parser.add_argument("--out", default=DEFAULT_CORPUS_DIR, help="Corpus directory")
+    return parser.parse_args()
+
+
+def main() -> None:
+    load_dotenv()
+    setup_logging()
+    args = parse_args()
+    generator = BoardGenerator()
+
+    writers = {}
+    jobs = []
+    for language, level, difficulty in itertools.product(args.languages, args.levels, args.difficulties):
+        writers[(language, level, difficulty)] = BoardCorpusWriter(args.out, language, level, difficulty)
+        jobs.extend([(language, level, difficulty)] * args.count)
+
+    def build(job):
+        language, level, difficulty = job
+        num_chains, grid_size = DIFFICULTY_PRESETS[difficulty]
+        board = generator.generate_board(
+            num_chains=num_chains,
+            grid_size=grid_size,
+            use_templates=args.use_templates,
+            language=language,
+            language_level=level
+        )
+        if board.degradation is not None:
+            # Local or partial boards (LLM down, budget spent) must not become permanent corpus puzzles
+            raise RuntimeError(f"degraded board skipped ({board.degradation})")
+        writers[job].append(board)
+
+    done = failed = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = [executor.submit(build, job) for job in jobs]
+        for future in as_completed(futures):
+            try:
+                future.result()
+                done += 1
+            except Exception as e:
+                failed += 1
+                print(f"Board failed: {e}")
+            if (done + failed) % 50 == 0:
+                print(f"{done + failed}/{len(jobs)} boards ({failed} failed)")
+
+    for writer in writers.values():
+        writer.close()
+    print(f"Wrote {done} boards to {args.out} ({failed} failed)")
+
+
+if __name__ == "__main__":
+    main()
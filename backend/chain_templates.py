@@ -1,3 +1,4 @@
+import random
 from typing import List, Dict, Optional
 
 LAYOUT_TEMPLATES: List[Dict] = [
@@ -257,10 +258,9 @@ LAYOUT_TEMPLATES: List[Dict] = [
     }
 ]
 
-def get_template_by_chain_count(num_chains: int) -> Optional[Dict]:
+def get_template_by_chain_count(num_chains: int, rng: Optional[random.Random] = None) -> Optional[Dict]:
     """Returns a template that matches the requested number of chains"""
-    import random
     matching = [t for t in LAYOUT_TEMPLATES if len(t['chains']) == num_chains]
     if matching:
-        return random.choice(matching)
+        return (rng or random).choice(matching)
     return None
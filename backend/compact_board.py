@@ -0,0 +1,89 @@
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from models import Cell, ConnectionBetweenCells, GameBoard
+
+
+class CompactBoard:
+    """Internal board used while generating.
+
+    Cells live in parallel arrays (coordinates, words, given flags) and edges
+    refer to cells by index, so normalizing only shifts the coordinate arrays.
+    Pydantic models are built once, in to_game_board().
+    """
+
+    __slots__ = ("row", "col", "words", "given", "edge_from", "edge_to", "edge_labels", "index", "category")
+
+    def __init__(self, category: Optional[str] = None):
+        self.row = array("i")
+        self.col = array("i")
+        self.words: List[Optional[str]] = []
+        self.given = bytearray()
+        self.edge_from = array("i")
+        self.edge_to = array("i")
+        self.edge_labels: List[str] = []
+        # (row, col) -> cell index, in generation coordinates
+        self.index: Dict[Tuple[int, int], int] = {}
+        self.category = category
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def add_cell(self, pos: Tuple[int, int], word: Optional[str]) -> int:
+        """Index of the cell at pos; the first word placed on a cell wins"""
+        idx = self.index.get(pos)
+        if idx is None:
+            idx = len(self.words)
+            self.index[pos] = idx
+            self.row.append(pos[0])
+            self.col.append(pos[1])
+            self.words.append(word)
+            self.given.append(0)
+        return idx
+
+    def add_chain(self, positions: Sequence[Tuple[int, int]], words: Sequence[str], connections: Sequence[str]) -> None:
+        cell_ids = [self.add_cell(pos, word) for pos, word in zip(positions, words)]
+        for i, label in enumerate(connections):
+            self.edge_from.append(cell_ids[i])
+            self.edge_to.append(cell_ids[i + 1])
+            self.edge_labels.append(label)
+
+    def mark_given(self, pos: Tuple[int, int]) -> None:
+        idx = self.index.get(pos)
+        if idx is not None:
+            self.given[idx] = 1
+
+    def normalize(self) -> Tuple[int, int]:
+        """Shift all cells so the board starts at (0, 0); returns (rows, cols)"""
+        if not self.words:
+            return 0, 0
+        min_row, min_col = min(self.row), min(self.col)
+        if min_row or min_col:
+            self.row = array("i", [r - min_row for r in self.row])
+            self.col = array("i", [c - min_col for c in self.col])
+            self.index = {(r, c): i for i, (r, c) in enumerate(zip(self.row, self.col))}
+        return max(self.row) + 1, max(self.col) + 1
+
+    def to_game_board(self, default_size: int = 0) -> GameBoard:
+        """Normalize and convert to the API model (values are already valid, so no re-validation)"""
+        rows, cols = self.normalize()
+        row, col, words, given = self.row, self.col, self.words, self.given
+        cells = [
+            Cell.model_construct(row=row[i], col=col[i], word=words[i], is_given=bool(given[i]))
+            for i in range(len(words))
+        ]
+        connections = [
+            ConnectionBetweenCells.model_construct(
+                from_cell=(row[a], col[a]),
+                to_cell=(row[b], col[b]),
+                connection=label
+            )
+            for a, b, label in zip(self.edge_from, self.edge_to, self.edge_labels)
+        ]
+        return GameBoard.model_construct(
+            rows=rows or default_size,
+            cols=cols or default_size,
+            cells=cells,
+            connections=connections,
+            category=self.category
+        )
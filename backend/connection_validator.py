@@ -1,53 +1,72 @@
+import contextvars
 import os
-import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Set, Tuple
 from openai import OpenAI
-from models import GameBoard, ValidationResult, BoardValidationResult
+from models import GameBoard, ValidationResult, BoardValidationResult, EdgeVerdict
+from llm import LLMUnavailable, complete_json_cascade, get_client, llm_available
+from rule_validators import RuleValidator
+from prompts import validation_messages
+
+# Connections validated in parallel within one BFS level
+VALIDATION_MAX_WORKERS = int(os.getenv("VALIDATION_MAX_WORKERS", "8"))
 
 
 class ConnectionValidator:
     """Validates word connections using OpenAI"""
     
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, client: Optional[OpenAI] = None):
+        self._client = client
+        self.rules = RuleValidator()
+    
+    @property
+    def client(self) -> OpenAI:
+        """Injected client, or the process-wide pooled one (built on first use)"""
+        return self._client or get_client()
     
     def validate_connection(self, word1: str, word2: str, connection: str) -> ValidationResult:
-        prompt = f"""
-            Determine if there is a valid '{connection}' relationship between the words '{word1}' and '{word2}'.
-
-            Return the result in the following JSON format:
-            {{
-                "is_valid": true or false,
-                "reason": "brief explanation"
-            }}
-        """
+        # Mechanically checkable connections are answered without the model
+        ruled = self.rules.validate(word1, word2, connection)
+        if ruled is not None:
+            return ruled
+        if not llm_available():
+            return self._deferred()
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a linguistic expert validating word relationships."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=100,
-                response_format={"type": "json_object"}
-            )
-
-            result_data = json.loads(response.choices[0].message.content)
-            
-            return ValidationResult(
-                is_valid=result_data.get("is_valid", False), 
-                reason=result_data.get("reason", "No reason provided")
+            # Cheap tier first; unsure or malformed verdicts escalate
+            return complete_json_cascade(
+                self.client,
+                messages=validation_messages(word1, word2, connection),
+                parse=self._parse_verdict,
+                max_tokens=80
             )
             
+        except LLMUnavailable:
+            return self._deferred()
         except Exception as e:
             return ValidationResult(
                 is_valid=False, 
                 reason=f"Validation error: {str(e)}"
             )
     
+    @staticmethod
+    def _parse_verdict(data: dict) -> Optional[ValidationResult]:
+        # Only a real boolean counts: bool("false") is True, so anything else escalates
+        is_valid = data.get("is_valid")
+        if not isinstance(is_valid, bool):
+            return None
+        return ValidationResult(is_valid=is_valid, reason=data.get("reason", "No reason provided"))
+    
+    @staticmethod
+    def _deferred() -> ValidationResult:
+        """Fast answer while the LLM circuit breaker is open; the client should retry later"""
+        return ValidationResult(is_valid=False, reason="Validation deferred: language model unavailable", deferred=True)
+    
     def validate_board(self, board: GameBoard) -> BoardValidationResult:
         """Validate all connections in a board"""
         invalid_connections = []
+        deferred_connections = []
         
         word_map = {(cell.row, cell.col): cell.word for cell in board.cells if cell.word}
         
@@ -65,18 +84,126 @@ class ConnectionValidator:
             
             result = self.validate_connection(word1, word2, conn.connection)
             
-            if not result.is_valid:
+            if result.deferred:
+                deferred_connections.append({
+                    'from_cell': conn.from_cell,
+                    'to_cell': conn.to_cell,
+                    'word1': word1,
+                    'word2': word2,
+                    'connection_type': conn.connection
+                })
+            elif not result.is_valid:
                 invalid_connections.append({
                     'from_cell': conn.from_cell,
                     'to_cell': conn.to_cell,
                     'word1': word1,
                     'word2': word2,
-                    'connection_type': conn.connection.type,
+                    'connection_type': conn.connection,
                     'reason': result.reason
                 })
         
         return BoardValidationResult(
-            is_valid=len(invalid_connections) == 0,
-            invalid_connections=invalid_connections
+            is_valid=len(invalid_connections) == 0 and len(deferred_connections) == 0,
+            invalid_connections=invalid_connections,
+            deferred_connections=deferred_connections
         )
 
+    
+    def validate_board_bfs(
+        self,
+        board: GameBoard,
+        stop_at_first_failure: bool = False,
+        max_workers: Optional[int] = None
+    ) -> Iterator[EdgeVerdict]:
+        """Validate connections outward from the given cells, yielding each verdict as it arrives.
+        
+        Edges are checked level by level in BFS order; all edges of a level run in
+        parallel. With stop_at_first_failure, cells reached only through a broken
+        link are not expanded and the edges behind them are reported as skipped.
+        """
+        word_map = {(cell.row, cell.col): cell.word for cell in board.cells if cell.word}
+        adjacency: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for i, conn in enumerate(board.connections):
+            adjacency[conn.from_cell].append(i)
+            adjacency[conn.to_cell].append(i)
+        
+        roots = [(cell.row, cell.col) for cell in board.cells if cell.is_given]
+        visited_edges: Set[int] = set()
+        reached: Set[Tuple[int, int]] = set()
+        
+        def bfs(frontier: List[Tuple[int, int]]) -> Iterator[EdgeVerdict]:
+            reached.update(frontier)
+            depth = 0
+            while frontier:
+                level = []
+                for pos in frontier:
+                    for i in adjacency[pos]:
+                        if i not in visited_edges:
+                            visited_edges.add(i)
+                            level.append((i, pos))
+                
+                futures = {
+                    # In a copy of this context, so tokens are booked under the calling endpoint
+                    executor.submit(contextvars.copy_context().run, self._edge_verdict, board.connections[i], word_map, depth): (i, pos)
+                    for i, pos in level
+                }
+                next_frontier = []
+                for future in as_completed(futures):
+                    i, pos = futures[future]
+                    verdict = future.result()
+                    yield verdict
+                    
+                    conn = board.connections[i]
+                    far = conn.to_cell if pos == conn.from_cell else conn.from_cell
+                    if far not in reached and (verdict.status in ("valid", "deferred") or not stop_at_first_failure):
+                        reached.add(far)
+                        next_frontier.append(far)
+                
+                frontier = next_frontier
+                depth += 1
+        
+        with ThreadPoolExecutor(max_workers=max_workers or VALIDATION_MAX_WORKERS) as executor:
+            # All given cells form the first BFS level
+            yield from bfs(roots or list(adjacency)[:1])
+            
+            if not stop_at_first_failure:
+                # Every edge is still checked; parts with no given cell start from their first cell
+                for pos in list(adjacency):
+                    if pos not in reached:
+                        yield from bfs([pos])
+        
+        # Whatever is left sits behind a broken link
+        for i, conn in enumerate(board.connections):
+            if i not in visited_edges:
+                yield EdgeVerdict(
+                    from_cell=conn.from_cell,
+                    to_cell=conn.to_cell,
+                    word1=word_map.get(conn.from_cell),
+                    word2=word_map.get(conn.to_cell),
+                    connection=conn.connection,
+                    status="skipped",
+                    reason="Behind a broken link",
+                    depth=-1
+                )
+    
+    def _edge_verdict(self, conn, word_map: Dict[Tuple[int, int], str], depth: int) -> EdgeVerdict:
+        word1 = word_map.get(conn.from_cell)
+        word2 = word_map.get(conn.to_cell)
+        
+        if not word1 or not word2:
+            status, reason = "invalid", "Missing word(s)"
+        else:
+            result = self.validate_connection(word1, word2, conn.connection)
+            status = "deferred" if result.deferred else ("valid" if result.is_valid else "invalid")
+            reason = result.reason
+        
+        return EdgeVerdict(
+            from_cell=conn.from_cell,
+            to_cell=conn.to_cell,
+            word1=word1,
+            word2=word2,
+            connection=conn.connection,
+            status=status,
+            reason=reason,
+            depth=depth
+        )
@@ -0,0 +1,61 @@
+import gzip
+import hashlib
+import os
+from typing import Any
+
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        # Already validated, so dump without running validators again
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(payload: Any) -> bytes:
+    """Serialize models, dicts and lists straight to JSON bytes with orjson"""
+    return orjson.dumps(payload, default=_default)
+
+
+def _accepts(request: Request, encoding: str) -> bool:
+    accepted = request.headers.get("accept-encoding", "")
+    return any(part.split(";")[0].strip() == encoding for part in accepted.split(","))
+
+
+def encoded_response(request: Request, body: bytes, etag: bool = False) -> Response:
+    """Send already-encoded JSON, honouring If-None-Match and compressing large bodies"""
+    headers = {"Vary": "Accept-Encoding"}
+
+    if etag:
+        tag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        headers["ETag"] = tag
+        if tag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+
+    if len(body) >= COMPRESSION_MIN_BYTES:
+        if brotli is not None and _accepts(request, "br"):
+            body = brotli.compress(body, quality=BROTLI_QUALITY)
+            headers["Content-Encoding"] = "br"
+        elif _accepts(request, "gzip"):
+            body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def json_response(request: Request, payload: Any, etag: bool = False) -> Response:
+    """orjson-encoded response that skips FastAPI's response_model re-validation"""
+    return encoded_response(request, dumps(payload), etag=etag)
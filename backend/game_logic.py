@@ -1,16 +1,68 @@
+import contextvars
+import json
+import logging
 import random
-from typing import List, Optional, Tuple, Set
+import time
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple, Set
 from openai import OpenAI
 import os
-from models import (Cell, ConnectionBetweenCells, GameBoard)
+from models import (GameBoard, GenerateBoardRequest, BatchBoardResult, BoardDegradation, TokenUsage, MAX_CHAINS)
+from compact_board import CompactBoard
 from chain_templates import get_template_by_chain_count
+from word_utils import UsedWords, normalize_word, clean_word, clean_words
+from word_memo import WordRelationMemo, DEFAULT_MEMO_PATH
+from board_corpus import BoardCorpus, DIFFICULTY_PRESETS
+from rule_validators import RuleValidator
+from llm import (LLMUnavailable, UNAVAILABLE_ERRORS, board_tokens, breaker, complete, complete_json_cascade, deadline,
+                 deadline_expired, get_client, replay, replay_segment, replaying, token_budget_exhausted,
+                 use_local_sources)
+from structured_logging import board_context
+from prompts import WORD_CANDIDATES, avoid_list, word_and_connection_messages, word_with_connection_messages
+
+logger = logging.getLogger("cix.generation")
+
+# LLM calls per chain step before giving up on a unique word
+MAX_WORD_ATTEMPTS = 3
+# Default worker pool size for batch generation
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "8"))
+# Lexicon words tried per chain, and words visited per try, when chains are built without the LLM
+LOCAL_START_TRIES = 20
+LOCAL_SEARCH_BUDGET = 500
+# Part of a request's deadline kept for assembling and encoding the board
+DEADLINE_MARGIN_MS = 50
+# How template boards are filled: "intersections" (crossing words first, then
+# every chain segment in parallel) or "sequential" (each chain after its parent)
+TEMPLATE_FILL_STRATEGY = os.getenv("TEMPLATE_FILL_STRATEGY", "intersections")
+# Chain segments of one board generated in parallel by the intersections strategy
+TEMPLATE_FILL_MAX_WORKERS = int(os.getenv("TEMPLATE_FILL_MAX_WORKERS", "8"))
+# Hint tokens allowed per word in a batched hint call
+HINT_TOKENS_PER_WORD = 60
+# Parallel single-word calls for words missing from a batched hint reply
+HINT_FALLBACK_WORKERS = 4
+
+
+class IntersectionFillError(Exception):
+    """The model's crossing words or bridges were unusable; the template is filled chain by chain instead"""
 
 
 class BoardGenerator:
     """Generates word chain puzzle boards"""
     
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, client: Optional[OpenAI] = None, corpus: Optional[BoardCorpus] = None):
+        self._client = client
+        # Set WORD_MEMO_PATH to an empty string to disable the relation memo
+        memo_path = os.getenv("WORD_MEMO_PATH", DEFAULT_MEMO_PATH)
+        self.memo = WordRelationMemo(memo_path) if memo_path else None
+        # Local sources used while the LLM circuit breaker is open
+        self.corpus = corpus
+        self.lexicon = RuleValidator()
+    
+    @property
+    def client(self) -> OpenAI:
+        """Injected client, or the process-wide pooled one (built on first use)"""
+        return self._client or get_client()
     
     def generate_hint(self, word: str, language: str = "English", language_level: str = "B1") -> str:
         """Generate a helpful hint for a word (translation or information)"""
@@ -38,7 +90,8 @@ class BoardGenerator:
             """
         
         try:
-            response = self.client.chat.completions.create(
+            content = complete(
+                self.client,
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": "You are a helpful language learning assistant. Provide clear, concise hints."},
@@ -48,11 +101,88 @@ class BoardGenerator:
                 max_tokens=150
             )
             
-            hint = response.choices[0].message.content.strip()
+            hint = content.strip()
             return hint
         except Exception as e:
-            print(f"Error generating hint: {e}")
-            return f"Hint unavailable for '{word}'. Try checking a dictionary!"
+            logger.warning("hint generation failed", extra={"word": word, "error": str(e)})
+            return self._hint_unavailable(word)
+    
+    @staticmethod
+    def _hint_unavailable(word: str) -> str:
+        return f"Hint unavailable for '{word}'. Try checking a dictionary!"
+    
+    def generate_hints(self, words: List[str], language: str = "English", language_level: str = "B1") -> Dict[str, str]:
+        """Hints for many words sharing a language and level, from one JSON completion.
+        
+        Words the reply leaves out (or answers with an empty hint) fall back to
+        generate_hint, a few at a time. Duplicate words are asked for once.
+        """
+        words = list(dict.fromkeys(word for word in words if word))
+        if not words:
+            return {}
+        
+        if language.lower() != "english":
+            instructions = f"""
+                The words are in {language} (level: {language_level}).
+                For each word, provide a helpful hint that includes:
+                1. English translation
+                2. A brief context or usage example
+            """
+        else:
+            instructions = f"""
+                For each word, provide a helpful hint suitable for {language_level} level learners.
+                Give interesting information such as:
+                - A simple definition
+                - Common usage context
+                - Related concepts
+            """
+        word_list = "\n".join(f"- {word}" for word in words)
+        prompt = f"""{instructions}
+                Keep each hint concise (1-2 sentences) and never reveal the word itself.
+
+                Words:
+{word_list}
+
+                Return ONLY in this JSON format, with every word as a key exactly as written:
+                {{"hints": {{"word": "hint"}}}}
+        """
+        
+        hints: Dict[str, str] = {}
+        try:
+            content = complete(
+                self.client,
+                model="gpt-4o-mini",
+                messages=[
+                    {"role": "system", "content": "You are a helpful language learning assistant. Provide clear, concise hints. Always respond with valid JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.7,
+                max_tokens=HINT_TOKENS_PER_WORD * len(words) + 16
+            )
+            # Match keys loosely: the model may change case or add whitespace
+            reply = {str(key).strip().lower(): value for key, value in (json.loads(content).get("hints") or {}).items()}
+            for word in words:
+                hint = reply.get(word.strip().lower())
+                if isinstance(hint, str) and hint.strip():
+                    hints[word] = hint.strip()
+        except UNAVAILABLE_ERRORS as e:
+            # Single calls would fail the same way
+            logger.warning("batched hints failed", extra={"words": len(words), "error": str(e)})
+            return {word: self._hint_unavailable(word) for word in words}
+        except Exception as e:
+            logger.warning("batched hints failed", extra={"words": len(words), "error": str(e)})
+        
+        missing = [word for word in words if word not in hints]
+        if missing:
+            logger.info("hints missing from batch", extra={"missing": len(missing), "words": len(words)})
+            with ThreadPoolExecutor(max_workers=min(HINT_FALLBACK_WORKERS, len(missing))) as executor:
+                fallback = executor.map(
+                    lambda word, ctx: ctx.run(self.generate_hint, word, language, language_level),
+                    missing, [contextvars.copy_context() for _ in missing]
+                )
+                hints.update(zip(missing, fallback))
+        return {word: hints[word] for word in words}
         
     def generate_board(
         self, 
@@ -62,13 +192,124 @@ class BoardGenerator:
         category: Optional[str] = None,
         use_templates: Optional[bool] = False,
         language: str = "English",
-        language_level: str = "B1"
+        language_level: str = "B1",
+        seed: Optional[int] = None,
+        deadline_ms: Optional[int] = None,
+        fill_strategy: Optional[str] = None
     ) -> GameBoard:
-        """Generate a game board with word chains"""
-        if use_templates:
-            return self._generate_board_from_template(num_chains, connection_types, category, grid_size, language, language_level)
-        else:
-            return self._generate_board_random(num_chains, connection_types, category, grid_size, language, language_level)
+        """Generate a game board with word chains.
+        
+        With a seed, every random choice comes from a per-request RNG and LLM
+        responses are recorded (or replayed, if this seed was seen before), so
+        the same seed and parameters rebuild the same board without the network.
+        
+        While the LLM circuit breaker is open, a matching corpus board is served
+        if there is one; otherwise words come from the memo and the lexicon, and
+        LLMUnavailable is raised as soon as no local word fits.
+        
+        With deadline_ms, no LLM call runs past the deadline: chains that are not
+        done by then are built from the lexicon or dropped, and board.degradation
+        says so. The same happens once the board has spent BOARD_TOKEN_BUDGET
+        tokens; board.token_usage reports what it spent.
+        """
+        rng = random.Random(seed)
+        budget = (max(deadline_ms - DEADLINE_MARGIN_MS, 0) / 1000) if deadline_ms is not None else None
+        with board_context(), (replay(seed) if seed is not None else nullcontext()), deadline(budget), board_tokens() as tokens:
+            started = time.perf_counter()
+            board = None
+            if use_local_sources():
+                board = self._corpus_board(num_chains, connection_types, category, language, language_level, rng)
+            if board is None:
+                try:
+                    if use_templates:
+                        board = self._generate_board_from_template(
+                            num_chains, connection_types, category, grid_size, language, language_level, rng,
+                            fill_strategy or TEMPLATE_FILL_STRATEGY
+                        )
+                    else:
+                        board = self._generate_board_random(num_chains, connection_types, category, grid_size, language, language_level, rng)
+                except LLMUnavailable:
+                    # Not even one chain could be built; a corpus board is the last resort
+                    board = self._corpus_board(num_chains, connection_types, category, language, language_level, rng)
+                    if board is None:
+                        raise
+            if seed is not None:
+                board.seed = seed
+            board.token_usage = TokenUsage(**tokens.snapshot())
+            logger.info("board generated", extra={
+                "num_chains": num_chains, "cells": len(board.cells), "seed": seed,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+                "total_tokens": board.token_usage.total_tokens
+            })
+            return board
+    
+    def generate_boards(
+        self,
+        requests: List[GenerateBoardRequest],
+        max_workers: Optional[int] = None
+    ) -> Iterator[BatchBoardResult]:
+        """Generate many boards in parallel, yielding each one as soon as it finishes.
+        
+        LLM calls from all workers share the process-wide budget in llm.py. A
+        failing board is reported with its error and does not stop the batch.
+        """
+        executor = ThreadPoolExecutor(max_workers=max_workers or BATCH_MAX_WORKERS)
+        try:
+            futures = {
+                # In a copy of this context, so tokens are booked under the calling endpoint
+                executor.submit(contextvars.copy_context().run, self.generate_board_from_request, request): index
+                for index, request in enumerate(requests)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    yield BatchBoardResult(index=index, board=future.result())
+                except Exception as e:
+                    yield BatchBoardResult(index=index, error=str(e))
+        finally:
+            # Stop queued boards if the consumer goes away early
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def generate_board_from_request(self, request: GenerateBoardRequest) -> GameBoard:
+        """Generate a board from an API request"""
+        return self.generate_board(
+            num_chains=request.num_chains,
+            grid_size=request.grid_size,
+            connection_types=request.connection_types,
+            category=request.category,
+            use_templates=request.use_templates,
+            language=request.language,
+            language_level=request.language_level,
+            seed=request.seed,
+            deadline_ms=request.deadline_ms,
+            fill_strategy=request.fill_strategy
+        )
+    
+    def _corpus_board(
+        self,
+        num_chains: int,
+        connection_types: Optional[List[str]],
+        category: Optional[str],
+        language: str,
+        language_level: str,
+        rng: random.Random
+    ) -> Optional[GameBoard]:
+        """A pre-generated board of the closest difficulty, for requests without theme constraints"""
+        if self.corpus is None or connection_types or category:
+            return None
+        difficulty = min(DIFFICULTY_PRESETS, key=lambda name: abs(DIFFICULTY_PRESETS[name][0] - num_chains))
+        raw = self.corpus.get(language or "English", language_level or "B1", difficulty, rng.getrandbits(63))
+        if raw is None:
+            return None
+        logger.warning("LLM unavailable, serving corpus board", extra={"difficulty": difficulty, "num_chains": num_chains})
+        board = GameBoard.model_validate_json(raw)
+        board.degradation = BoardDegradation(
+            requested_chains=num_chains,
+            corpus_board=True,
+            deadline_exceeded=deadline_expired(),
+            llm_unavailable=breaker.is_open
+        )
+        return board
     
     def _generate_board_from_template(
         self,
@@ -77,21 +318,35 @@ class BoardGenerator:
         category: Optional[str],
         grid_size: int,
         language: str,
-        language_level: str
+        language_level: str,
+        rng: random.Random,
+        fill_strategy: str = "sequential"
     ) -> GameBoard:
         """Generate a board using a layout template"""
-        template = get_template_by_chain_count(num_chains)
+        template = get_template_by_chain_count(num_chains, rng)
         
         if not template:
-            print(f"No template found for {num_chains} chains, using random generation")
-            return self._generate_board_random(num_chains, connection_types, category, grid_size, language, language_level)
+            logger.info("no template, using random generation", extra={"num_chains": num_chains})
+            return self._generate_board_random(num_chains, connection_types, category, grid_size, language, language_level, rng)
+        if use_local_sources():
+            # Fixed crossings rarely fit the small local lexicon; the random layout can pick other ones
+            logger.info("LLM unavailable, using random generation", extra={"num_chains": num_chains})
+            return self._generate_board_random(num_chains, connection_types, category, grid_size, language, language_level, rng)
         
-        print(f"Using template: {template['name']}")
+        logger.info("using template", extra={"template": template['name'], "fill_strategy": fill_strategy})
+        all_positions = self._template_positions(template)
         
-        chains = []
-        occupied_cells: Set[Tuple[int, int]] = set()
-        all_connections = []
-        used_words: Set[str] = set()  # Track used words across all chains
+        if fill_strategy == "intersections":
+            try:
+                filled = self._fill_template_intersections(
+                    template, all_positions, connection_types, category, language, language_level, rng
+                )
+                return self._assemble_board(filled, category, grid_size, rng, num_chains)
+            except IntersectionFillError as e:
+                logger.warning("intersection fill failed, filling chain by chain", extra={"error": str(e)})
+        
+        chains: List[Optional[dict]] = []  # By template index; None for a dropped chain
+        used_words = UsedWords(language)  # Track used words across all chains
         
         # Process each chain in the template
         for chain_idx, chain_config in enumerate(template['chains']):
@@ -99,106 +354,305 @@ class BoardGenerator:
             direction = chain_config['direction']
             overlap_chain_idx = chain_config['overlap_chain_idx']
             
+            if overlap_chain_idx is not None and chains[overlap_chain_idx] is None:
+                # Its parent was dropped, so there is nothing to cross
+                chains.append(None)
+                continue
+            
+            positions = all_positions[chain_idx]
+            
+            try:
+                if overlap_chain_idx is None:
+                    word_chain = self._generate_first_chain(chain_length, connection_types, category, language, language_level, rng, used_words)
+                else:
+                    parent_chain = chains[overlap_chain_idx]
+                    overlap_at_parent = chain_config['overlap_at_parent']
+                    overlap_at_self = chain_config['overlap_at_self']
+                    seed_word = parent_chain['words'][overlap_at_parent]
+                    
+                    word_chain = self._generate_chain_with_seed(
+                        chain_length, connection_types, category, seed_word, overlap_at_self, language, language_level, rng, used_words
+                    )
+            except LLMUnavailable:
+                if not any(chains):
+                    raise
+                # Out of time (or LLM) and no local chain fits: leave this chain out
+                logger.warning("chain dropped", extra={"chain": chain_idx, "deadline_exceeded": deadline_expired()})
+                chains.append(None)
+                continue
+            
+            chains.append({
+                'words': word_chain['words'],
+                'connections': word_chain['connections'],
+                'positions': positions,
+                'direction': direction,
+                'local': word_chain.get('local', False)
+            })
+        
+        return self._assemble_board([chain for chain in chains if chain], category, grid_size, rng, num_chains)
+    
+    @staticmethod
+    def _template_positions(template: dict) -> List[List[Tuple[int, int]]]:
+        """Cell positions of every template chain, which depend only on the layout"""
+        all_positions: List[List[Tuple[int, int]]] = []
+        for chain_config in template['chains']:
+            chain_length = chain_config['length']
+            direction = chain_config['direction']
+            overlap_chain_idx = chain_config['overlap_chain_idx']
+            
             if overlap_chain_idx is None:
                 start_row = chain_config['start_row']
                 start_col = chain_config['start_col']
-                
-                if direction == 'horizontal':
-                    positions = [(start_row, start_col + i) for i in range(chain_length)]
-                else:
-                    positions = [(start_row + i, start_col) for i in range(chain_length)]
             else:
-                parent_chain = chains[overlap_chain_idx]
-                overlap_at_parent = chain_config['overlap_at_parent']
+                # Line up overlap_at_self with the parent's cell at overlap_at_parent
+                overlap_pos = all_positions[overlap_chain_idx][chain_config['overlap_at_parent']]
                 overlap_at_self = chain_config['overlap_at_self']
-                
-                overlap_pos = parent_chain['positions'][overlap_at_parent]
-                
                 if direction == 'horizontal':
-                    start_col = overlap_pos[1] - overlap_at_self
-                    row = overlap_pos[0]
-                    positions = [(row, start_col + i) for i in range(chain_length)]
+                    start_row, start_col = overlap_pos[0], overlap_pos[1] - overlap_at_self
                 else:
-                    start_row = overlap_pos[0] - overlap_at_self
-                    col = overlap_pos[1]
-                    positions = [(start_row + i, col) for i in range(chain_length)]
+                    start_row, start_col = overlap_pos[0] - overlap_at_self, overlap_pos[1]
             
-            if overlap_chain_idx is None:
-                word_chain = self._generate_first_chain(chain_length, connection_types, category, language, language_level)
-                # Add words from first chain to used_words
-                for word in word_chain['words']:
-                    used_words.add(word.lower())
+            if direction == 'horizontal':
+                all_positions.append([(start_row, start_col + i) for i in range(chain_length)])
             else:
-                parent_chain = chains[overlap_chain_idx]
-                overlap_at_parent = chain_config['overlap_at_parent']
-                overlap_at_self = chain_config['overlap_at_self']
-                seed_word = parent_chain['words'][overlap_at_parent]
-                
-                word_chain = self._generate_chain_with_seed(
-                    chain_length, connection_types, category, seed_word, overlap_at_self, language, language_level, used_words
-                )
-            
-            chains.append({
-                'words': word_chain['words'],
-                'connections': word_chain['connections'],
-                'positions': positions,
-                'direction': direction
-            })
-            
+                all_positions.append([(start_row + i, start_col) for i in range(chain_length)])
+        return all_positions
+    
+    def _fill_template_intersections(
+        self,
+        template: dict,
+        all_positions: List[List[Tuple[int, int]]],
+        connection_types: Optional[List[str]],
+        category: Optional[str],
+        language: str,
+        language_level: str,
+        rng: random.Random
+    ) -> List[dict]:
+        """Fill a template crossing words first, then every chain segment at once.
+        
+        One structured call picks the words of all cells shared by two or more
+        chains. Each chain then splits at its crossings into independent
+        segments (an open end grown outward from a crossing, or a bridge between
+        two crossings), and all segments of the board are generated in parallel,
+        each seeing only the crossing words. Every segment gets its own RNG and
+        replay counters, so seeded boards replay identically. Merged in task
+        order, a segment that repeats a word already placed is generated again
+        with the whole board to avoid. Segments the LLM cannot fill come from
+        the lexicon; a chain is dropped only when that fails too, and
+        IntersectionFillError is raised when no chain is left.
+        """
+        # Crossing cells and where each chain passes through them
+        owners: Dict[Tuple[int, int], List[int]] = {}
+        for chain_idx, positions in enumerate(all_positions):
             for pos in positions:
-                occupied_cells.add(pos)
+                owners.setdefault(pos, []).append(chain_idx)
+        crossings = sorted(pos for pos, chain_ids in owners.items() if len(chain_ids) > 1)
         
-        cells_dict = {}
-        for chain in chains:
-            for idx, pos in enumerate(chain['positions']):
-                if pos not in cells_dict:
-                    cells_dict[pos] = Cell(
-                        row=pos[0],
-                        col=pos[1],
-                        word=chain['words'][idx],
+        # Steps between consecutive crossings along each chain, for the crossing prompt
+        links: List[Tuple[int, int, int]] = []
+        for positions in all_positions:
+            on_chain = [(i, crossings.index(pos)) for i, pos in enumerate(positions) if pos in owners and len(owners[pos]) > 1]
+            for (i, a), (j, b) in zip(on_chain, on_chain[1:]):
+                links.append((a, b, j - i))
+        
+        try:
+            crossing_words = self._generate_crossing_words(len(crossings), links, category, language, language_level)
+        except Exception as e:
+            raise IntersectionFillError(f"crossing words: {e}") from e
+        word_at = dict(zip(crossings, crossing_words))
+        base_used = UsedWords(language, crossing_words)
+        
+        # Split every chain into segments around its crossings
+        tasks = []  # (chain_idx, kind, args)
+        for chain_idx, positions in enumerate(all_positions):
+            fixed = [i for i, pos in enumerate(positions) if pos in word_at]
+            length = len(positions)
+            if not fixed:
+                tasks.append((chain_idx, "free", (length,)))
+                continue
+            if fixed[0] > 0:
+                tasks.append((chain_idx, "before", (word_at[positions[fixed[0]]], fixed[0])))
+            for i, j in zip(fixed, fixed[1:]):
+                tasks.append((chain_idx, "bridge", (word_at[positions[i]], word_at[positions[j]], j - i - 1, i)))
+            if fixed[-1] < length - 1:
+                tasks.append((chain_idx, "after", (word_at[positions[fixed[-1]]], length - 1 - fixed[-1], fixed[-1])))
+        
+        def run(n: int) -> Tuple[List[str], List[str], bool]:
+            # Segments growing from the same crossing send identical prompts; their own counters keep replays apart
+            with replay_segment(f"segment {n}"):
+                return self._fill_segment(
+                    tasks[n][1], tasks[n][2], connection_types, category, language, language_level, base_used.copy(), task_rngs[n]
+                )
+        
+        # Derived up front, in task order, so results do not depend on thread timing
+        task_rngs = [random.Random(rng.getrandbits(64)) for _ in tasks]
+        results: Dict[int, Tuple[List[str], List[str], bool]] = {}
+        dropped: Set[int] = set()
+        with ThreadPoolExecutor(max_workers=max(1, min(TEMPLATE_FILL_MAX_WORKERS, len(tasks)))) as executor:
+            # Each task runs in a copy of this context: board_id for logs, replay scope and deadline
+            futures = {executor.submit(contextvars.copy_context().run, run, n): n for n in range(len(tasks))}
+            for future in as_completed(futures):
+                n = futures[future]
+                try:
+                    results[n] = future.result()
+                except UNAVAILABLE_ERRORS:
+                    dropped.add(tasks[n][0])
+                except Exception as e:
+                    raise IntersectionFillError(f"{tasks[n][1]} segment: {e}") from e
+        
+        # Segments ran blind to each other; redo, in task order, any that repeats a word already on the board
+        board_used = base_used.copy()
+        for n, (chain_idx, kind, args) in enumerate(tasks):
+            if chain_idx in dropped:
+                continue
+            keys = [normalize_word(word, language) for word in results[n][0]]
+            if len(set(keys)) < len(keys) or any(key in board_used for key in keys):
+                try:
+                    results[n] = self._fill_segment(
+                        kind, args, connection_types, category, language, language_level, board_used.copy(), task_rngs[n]
                     )
+                except UNAVAILABLE_ERRORS:
+                    dropped.add(chain_idx)
+                    continue
+                keys = [normalize_word(word, language) for word in results[n][0]]
+                if len(set(keys)) < len(keys) or any(key in board_used for key in keys):
+                    logger.warning("segment repeats board words", extra={"chain": chain_idx, "segment": kind})
+                    dropped.add(chain_idx)
+                    continue
+            for word in results[n][0]:
+                board_used.add(word)
         
-        # Mark given cells: one per chain + two additional
-        self._mark_given_cells(cells_dict, chains)
+        # Keep the board in one piece: a chain only reachable through dropped ones goes too
+        kept = [chain_idx for chain_idx in range(len(all_positions)) if chain_idx not in dropped]
+        reached = set(kept[:1])
+        frontier = list(reached)
+        while frontier:
+            chain_idx = frontier.pop()
+            for pos in all_positions[chain_idx]:
+                for other in owners[pos]:
+                    if other not in reached and other not in dropped:
+                        reached.add(other)
+                        frontier.append(other)
+        dropped.update(set(kept) - reached)
         
-        for chain in chains:
-            for i in range(len(chain['positions']) - 1):
-                from_pos = chain['positions'][i]
-                to_pos = chain['positions'][i + 1]
-                
-                all_connections.append(ConnectionBetweenCells(
-                    from_cell=from_pos,
-                    to_cell=to_pos,
-                    connection=chain['connections'][i]
-                ))
-        
-        # Calculate actual grid dimensions from cell positions
-        all_rows = [cell.row for cell in cells_dict.values()]
-        all_cols = [cell.col for cell in cells_dict.values()]
-        actual_rows = max(all_rows) - min(all_rows) + 1 if all_rows else grid_size
-        actual_cols = max(all_cols) - min(all_cols) + 1 if all_cols else grid_size
-        
-        # Normalize cell positions to start from (0, 0)
-        min_row = min(all_rows) if all_rows else 0
-        min_col = min(all_cols) if all_cols else 0
-        
-        # Update cell positions to be 0-indexed from top-left
-        for cell in cells_dict.values():
-            cell.row -= min_row
-            cell.col -= min_col
-        
-        # Update connection positions
-        for conn in all_connections:
-            conn.from_cell = (conn.from_cell[0] - min_row, conn.from_cell[1] - min_col)
-            conn.to_cell = (conn.to_cell[0] - min_row, conn.to_cell[1] - min_col)
-        
-        return GameBoard(
-            rows=actual_rows,
-            cols=actual_cols,
-            cells=list(cells_dict.values()),
-            connections=all_connections,
-            category=category
-        )
+        chains: List[dict] = []
+        for chain_idx, positions in enumerate(all_positions):
+            if chain_idx in dropped:
+                logger.warning("chain dropped", extra={"chain": chain_idx, "deadline_exceeded": deadline_expired()})
+                continue
+            length = len(positions)
+            words: List[Optional[str]] = [word_at.get(pos) for pos in positions]
+            connections: List[Optional[str]] = [None] * (length - 1)
+            local = False
+            for n, (task_chain, kind, args) in enumerate(tasks):
+                if task_chain != chain_idx:
+                    continue
+                seg_words, seg_connections, seg_local = results[n]
+                local = local or seg_local
+                if kind == "free":
+                    words, connections = list(seg_words), list(seg_connections)
+                elif kind == "after":
+                    start = args[2]
+                    words[start + 1:] = seg_words
+                    connections[start:] = seg_connections
+                elif kind == "before":
+                    # Grown outward from the crossing, so reversed into chain order
+                    words[:args[1]] = reversed(seg_words)
+                    connections[:args[1]] = reversed(seg_connections)
+                else:
+                    start = args[3]
+                    words[start + 1:start + 1 + args[2]] = seg_words
+                    connections[start:start + 1 + args[2]] = seg_connections
+            chains.append({
+                'words': words,
+                'connections': connections,
+                'positions': positions,
+                'direction': template['chains'][chain_idx]['direction'],
+                'local': local
+            })
+        
+        if not chains:
+            raise IntersectionFillError("no template chain could be filled")
+        return chains
+    
+    def _fill_segment(
+        self,
+        kind: str,
+        args: tuple,
+        connection_types: Optional[List[str]],
+        category: Optional[str],
+        language: str,
+        language_level: str,
+        used_words: UsedWords,
+        rng: random.Random
+    ) -> Tuple[List[str], List[str], bool]:
+        """Words and connections of one template segment, and whether they came from local sources"""
+        if kind == "free":
+            chain = self._generate_first_chain(args[0], connection_types, category, language, language_level, rng, used_words)
+            return chain['words'], chain['connections'], chain.get('local', False)
+        if kind == "bridge":
+            try:
+                if use_local_sources():
+                    raise LLMUnavailable("LLM unavailable")
+                words, connections = self._generate_bridge(
+                    args[0], args[1], args[2], connection_types, category, language, language_level, used_words
+                )
+                return words, connections, False
+            except UNAVAILABLE_ERRORS:
+                path = self._local_segment(args[0], args[2], connection_types, language, used_words, rng, target=args[1])
+                return [word for word, _ in path[:-1]], [connection for _, connection in path], True
+        return self._extend_word(args[0], args[1], connection_types, category, language, language_level, used_words, rng)
+    
+    def _extend_word(
+        self,
+        word: str,
+        steps: int,
+        connection_types: Optional[List[str]],
+        category: Optional[str],
+        language: str,
+        language_level: str,
+        used_words: UsedWords,
+        rng: random.Random
+    ) -> Tuple[List[str], List[str], bool]:
+        """Grow a chain segment `steps` words outward from a fixed word (from the lexicon if the LLM drops out)"""
+        words, connections = [], []
+        try:
+            if use_local_sources():
+                raise LLMUnavailable("LLM unavailable")
+            current = word
+            for _ in range(steps):
+                next_word, connection_type = self._next_word(
+                    current, connection_types, category, language, language_level, used_words, rng
+                )
+                words.append(next_word)
+                connections.append(connection_type)
+                used_words.add(next_word)
+                current = next_word
+        except UNAVAILABLE_ERRORS:
+            # Start over with a search that can back out of dead ends
+            for placed in words:
+                used_words.discard(placed)
+            path = self._local_segment(word, steps, connection_types, language, used_words, rng)
+            return [word for word, _ in path], [connection for _, connection in path], True
+        return words, connections, False
+    
+    def _local_segment(
+        self,
+        word: str,
+        steps: int,
+        connection_types: Optional[List[str]],
+        language: str,
+        used_words: UsedWords,
+        rng: random.Random,
+        target: Optional[str] = None
+    ) -> List[Tuple[str, str]]:
+        """Lexicon path of `steps` words from word (then on to target, if given); raises LLMUnavailable if none fits"""
+        if (language or "English").lower() != "english":
+            raise LLMUnavailable(f"LLM unavailable and no local lexicon for {language}")
+        path = self._local_path(word, steps, connection_types, language, used_words, rng, [LOCAL_SEARCH_BUDGET], target)
+        if path is None:
+            raise LLMUnavailable(f"LLM unavailable and no local segment fits from '{word}'" + (f" to '{target}'" if target else ""))
+        return path
     
     def _generate_board_random(
         self,
@@ -207,41 +661,43 @@ class BoardGenerator:
         category: Optional[str],
         grid_size: int,
         language: str,
-        language_level: str
+        language_level: str,
+        rng: random.Random
     ) -> GameBoard:
         """Generate a board with random positioning"""
         chain_length = 6
         
         chains = []
         occupied_cells: Set[Tuple[int, int]] = set()
-        all_connections = []
-        used_words: Set[str] = set()  # Track used words across all chains
+        used_words = UsedWords(language)  # Track used words across all chains
         
-        first_chain = self._generate_first_chain(chain_length, connection_types, category, language, language_level)
+        first_chain = self._generate_first_chain(chain_length, connection_types, category, language, language_level, rng, used_words)
         
-        # Add words from first chain to used_words
-        for word in first_chain['words']:
-            used_words.add(word.lower())
-
-        print(first_chain)
-        
-        start_row = random.randint(0, grid_size - 1)
-        start_col = random.randint(0, grid_size - chain_length)
+        start_row = rng.randint(0, grid_size - 1)
+        start_col = rng.randint(0, grid_size - chain_length)
         first_positions = [(start_row, start_col + i) for i in range(chain_length)]
         chains.append({
             'words': first_chain['words'],
             'connections': first_chain['connections'],
             'positions': first_positions,
-            'direction': 'horizontal'
+            'direction': 'horizontal',
+            'local': first_chain.get('local', False)
         })
         
-        print(f"Chain 0 (first): positions: {first_positions[:2]}...{first_positions[-2:]}")
+        logger.debug("chain placed", extra={
+            "chain": 0, "words": tuple(first_chain['words']), "start": first_positions[0], "direction": 'horizontal'
+        })
         
         for pos in chains[0]['positions']:
             occupied_cells.add(pos)
 
         chain_idx = 1  # Start at 1 since we already have the first chain
         max_attempts_per_chain = 50  # Limit attempts to find valid position
+        if num_chains > MAX_CHAINS:
+            # Marathon boards: placement tries are cheap next to the LLM calls, so search harder
+            max_attempts_per_chain = 50 * num_chains
+        
+        local_misses = 0  # Crossings no local chain could be built through
         
         while chain_idx < num_chains:
             attempts = 0
@@ -252,8 +708,8 @@ class BoardGenerator:
             
             # Try to find a valid position for the new chain
             while attempts < max_attempts_per_chain and positions is None:
-                parent_chain = random.choice(chains)
-                overlap_idx = random.randint(0, len(parent_chain['positions']) - 1)
+                parent_chain = rng.choice(chains)
+                overlap_idx = rng.randint(0, len(parent_chain['positions']) - 1)
                 overlap_pos = parent_chain['positions'][overlap_idx]
                 overlap_word = parent_chain['words'][overlap_idx]
                 
@@ -271,18 +727,32 @@ class BoardGenerator:
                 attempts += 1
             
             if positions:
-                print(f"Chain {chain_idx}: Overlapping at {selected_overlap_pos} (index {selected_overlap_idx}), positions: {positions[:2]}...{positions[-2:]}")
+                logger.debug("chain overlap found", extra={
+                    "chain": chain_idx, "overlap_pos": selected_overlap_pos, "overlap_idx": selected_overlap_idx
+                })
                 
                 # Use the selected overlap_idx and overlap_word that correspond to the valid positions
-                new_chain = self._generate_chain_with_seed(
-                    chain_length, connection_types, category, selected_overlap_word, selected_overlap_idx, language, language_level, used_words
-                )
+                try:
+                    new_chain = self._generate_chain_with_seed(
+                        chain_length, connection_types, category, selected_overlap_word, selected_overlap_idx, language, language_level, rng, used_words
+                    )
+                except LLMUnavailable:
+                    # Without the LLM some crossing words lead nowhere; try another crossing
+                    local_misses += 1
+                    if local_misses < LOCAL_START_TRIES:
+                        continue
+                    # The local sources are exhausted: serve the smaller board rather than fail it
+                    logger.warning("chains dropped", extra={
+                        "placed": chain_idx, "requested": num_chains, "deadline_exceeded": deadline_expired()
+                    })
+                    break
 
                 chains.append({
                     'words': new_chain['words'],
                     'connections': new_chain['connections'],
                     'positions': positions,
-                    'direction': direction
+                    'direction': direction,
+                    'local': new_chain.get('local', False)
                 })
                 
                 for pos in positions:
@@ -291,94 +761,71 @@ class BoardGenerator:
                 chain_idx += 1
             else:
                 # Couldn't find valid position after max attempts, stop adding chains
-                print(f"Warning: Could only place {chain_idx} out of {num_chains} chains")
+                logger.warning("could not place all chains", extra={"placed": chain_idx, "requested": num_chains})
                 break
         
-        cells_dict = {}
+        return self._assemble_board(chains, category, grid_size, rng, num_chains)
+    
+    def _assemble_board(
+        self,
+        chains: List[dict],
+        category: Optional[str],
+        grid_size: int,
+        rng: random.Random,
+        requested_chains: int
+    ) -> GameBoard:
+        """Lay the generated chains onto a compact board and convert it to a GameBoard once"""
+        board = CompactBoard(category)
         for chain in chains:
-            for idx, pos in enumerate(chain['positions']):
-                if pos not in cells_dict:
-                    cells_dict[pos] = Cell(
-                        row=pos[0],
-                        col=pos[1],
-                        word=chain['words'][idx],
-                    )
+            board.add_chain(chain['positions'], chain['words'], chain['connections'])
         
         # Mark given cells: one per chain + two additional
-        self._mark_given_cells(cells_dict, chains)
+        self._mark_given_cells(board, chains, rng)
         
-        for chain in chains:
-            for i in range(len(chain['positions']) - 1):
-                from_pos = chain['positions'][i]
-                to_pos = chain['positions'][i + 1]
-                
-                all_connections.append(ConnectionBetweenCells(
-                    from_cell=from_pos,
-                    to_cell=to_pos,
-                    connection=chain['connections'][i]
-                ))
-        
-        # Calculate actual grid dimensions from cell positions
-        all_rows = [cell.row for cell in cells_dict.values()]
-        all_cols = [cell.col for cell in cells_dict.values()]
-        actual_rows = max(all_rows) - min(all_rows) + 1 if all_rows else grid_size
-        actual_cols = max(all_cols) - min(all_cols) + 1 if all_cols else grid_size
-        
-        # Normalize cell positions to start from (0, 0)
-        min_row = min(all_rows) if all_rows else 0
-        min_col = min(all_cols) if all_cols else 0
-        
-        print(f"Normalization: subtracting min_row={min_row}, min_col={min_col}")
-        print(f"Original bounds: rows {min(all_rows)}-{max(all_rows)}, cols {min(all_cols)}-{max(all_cols)}")
-        
-        # Update cell positions to be 0-indexed from top-left
-        for cell in cells_dict.values():
-            cell.row -= min_row
-            cell.col -= min_col
-        
-        # Update connection positions
-        for conn in all_connections:
-            conn.from_cell = (conn.from_cell[0] - min_row, conn.from_cell[1] - min_col)
-            conn.to_cell = (conn.to_cell[0] - min_row, conn.to_cell[1] - min_col)
-        
-        print(f"After normalization: rows 0-{actual_rows-1}, cols 0-{actual_cols-1}")
-        
-        return GameBoard(
-            rows=actual_rows,
-            cols=actual_cols,
-            cells=list(cells_dict.values()),
-            connections=all_connections,
-            category=category
-        )
+        game_board = board.to_game_board(default_size=grid_size)
+        
+        dropped = requested_chains - len(chains)
+        local = sum(1 for chain in chains if chain.get('local'))
+        if dropped or local:
+            game_board.degradation = BoardDegradation(
+                requested_chains=requested_chains,
+                dropped_chains=dropped,
+                local_chains=local,
+                deadline_exceeded=deadline_expired(),
+                llm_unavailable=breaker.is_open,
+                token_budget_exceeded=token_budget_exhausted()
+            )
+        logger.debug("board assembled", extra={"rows": game_board.rows, "cols": game_board.cols, "cells": len(board)})
+        return game_board
     
     def _mark_given_cells(
         self,
-        cells_dict: dict,
-        chains: List[dict]
+        board: CompactBoard,
+        chains: List[dict],
+        rng: random.Random
     ) -> None:
         """Mark cells as given: one per chain + two additional"""
         given_positions = set()
         
         # Select one random cell from each chain
         for chain in chains:
-            random_pos = random.choice(chain['positions'])
+            random_pos = rng.choice(chain['positions'])
             given_positions.add(random_pos)
         
         # Select two additional random cells from all cells
-        all_positions = list(cells_dict.keys())
+        all_positions = list(board.index)
         # Filter out already selected positions
         available_positions = [pos for pos in all_positions if pos not in given_positions]
         
         # Select up to 2 additional cells (if available)
         num_additional = min(2, len(available_positions))
         if num_additional > 0:
-            additional_positions = random.sample(available_positions, num_additional)
+            additional_positions = rng.sample(available_positions, num_additional)
             given_positions.update(additional_positions)
         
         # Mark all selected cells as given
         for pos in given_positions:
-            if pos in cells_dict:
-                cells_dict[pos].is_given = True
+            board.mark_given(pos)
     
     def _generate_first_chain(
         self,
@@ -386,40 +833,35 @@ class BoardGenerator:
         connection_types: Optional[List[str]],
         category: Optional[str],
         language: str,
-        language_level: str
+        language_level: str,
+        rng: random.Random,
+        used_words: Optional[UsedWords] = None
     ) -> dict:
-        """Generate a single word chain"""
+        """Generate a single word chain (from the lexicon if the LLM drops out)"""
+        if used_words is None:
+            used_words = UsedWords(language)
+        
         words = []
         connections = []
-        used_words = set()
         
-        current_word = self._generate_word_start(category, language, language_level)
-        words.append(current_word)
-        used_words.add(current_word.lower())
-        
-        for _ in range(length - 1):
-            max_attempts = 10
-            next_word = None
-            connection_type = None
+        try:
+            if use_local_sources():
+                raise LLMUnavailable("LLM unavailable")
+            current_word = self._generate_word_start(category, language, language_level, rng)
+            words.append(current_word)
+            used_words.add(current_word)
             
-            for attempt in range(max_attempts):
-                if connection_types:
-                    connection_type = random.choice(connection_types)
-                    next_word = self._generate_word_with_connection(current_word, connection_type, category, language, language_level, used_words)
-                else:
-                    next_word, connection_type = self._generate_word_and_connection(current_word, category, language, language_level, used_words)
+            for _ in range(length - 1):
+                next_word, connection_type = self._next_word(
+                    current_word, connection_types, category, language, language_level, used_words, rng
+                )
                 
-                # Check if word is unique
-                if next_word.lower() not in used_words:
-                    break
-                elif attempt == max_attempts - 1:
-                    # Last attempt, just use it
-                    print(f"Warning: Could not find unique word after {max_attempts} attempts")
-            
-            connections.append(connection_type)
-            words.append(next_word)
-            used_words.add(next_word.lower())
-            current_word = next_word
+                connections.append(connection_type)
+                words.append(next_word)
+                used_words.add(next_word)
+                current_word = next_word
+        except UNAVAILABLE_ERRORS:
+            return self._local_chain(length, connection_types, language, used_words, rng)
         
         return {'words': words, 'connections': connections}
     
@@ -432,71 +874,203 @@ class BoardGenerator:
         seed_position: int,
         language: str,
         language_level: str,
-        used_words: Optional[Set[str]] = None
+        rng: random.Random,
+        used_words: Optional[UsedWords] = None
     ) -> dict:
-        """Generate chain with seed word at specific position"""
+        """Generate chain with seed word at specific position (from the lexicon if the LLM drops out)"""
         if used_words is None:
-            used_words = set()
+            used_words = UsedWords(language)
         
         words = [None] * length
         connections = [None] * (length - 1)
         words[seed_position] = seed_word
         
-        # Generate forward from seed
-        for i in range(seed_position, length - 1):
-            max_attempts = 10
-            next_word = None
-            connection_type = None
+        try:
+            if use_local_sources():
+                raise LLMUnavailable("LLM unavailable")
             
-            for attempt in range(max_attempts):
-                if connection_types:
-                    connection_type = random.choice(connection_types)
-                    next_word = self._generate_word_with_connection(words[i], connection_type, category, language, language_level, used_words)
-                else:
-                    next_word, connection_type = self._generate_word_and_connection(words[i], category, language, language_level, used_words)
+            # Generate forward from seed
+            for i in range(seed_position, length - 1):
+                next_word, connection_type = self._next_word(
+                    words[i], connection_types, category, language, language_level, used_words, rng
+                )
                 
-                # Check if word is unique
-                if next_word.lower() not in used_words:
-                    break
-                elif attempt == max_attempts - 1:
-                    print(f"Warning: Could not find unique word after {max_attempts} attempts")
-            
-            connections[i] = connection_type
-            words[i + 1] = next_word
-            used_words.add(next_word.lower())
-        
-        # Generate backward from seed
-        for i in range(seed_position - 1, -1, -1):
-            max_attempts = 10
-            prev_word = None
-            connection_type = None
+                connections[i] = connection_type
+                words[i + 1] = next_word
+                used_words.add(next_word)
             
-            for attempt in range(max_attempts):
+            # Generate backward from seed
+            for i in range(seed_position - 1, -1, -1):
+                prev_word, connection_type = self._next_word(
+                    words[i + 1], connection_types, category, language, language_level, used_words, rng
+                )
+                
+                connections[i] = connection_type
+                words[i] = prev_word
+                used_words.add(prev_word)
+        except UNAVAILABLE_ERRORS:
+            return self._local_chain(length, connection_types, language, used_words, rng, seed_word, seed_position)
+        
+        return {'words': words, 'connections': connections}
+    
+    def _next_word(
+        self,
+        source_word: str,
+        connection_types: Optional[List[str]],
+        category: Optional[str],
+        language: str,
+        language_level: str,
+        used_words: UsedWords,
+        rng: random.Random
+    ) -> Tuple[str, str]:
+        """Pick the best unused candidate connected to source_word.
+        
+        Remembered relations are reused unless the memo decides to explore.
+        Otherwise each call asks the model for a ranked list of candidates; the
+        LLM is only asked again when every candidate is already on the board.
+        Seeded (replayed) generation skips the memo, whose contents change
+        between runs. While the LLM is unavailable only local sources are used,
+        except that a seeded replay still serves its recorded responses.
+        """
+        if self.memo and not replaying() and not self.memo.should_explore():
+            remembered = self.memo.sample(source_word, connection_types, category, language, language_level, used_words)
+            if remembered:
+                return remembered
+        
+        if use_local_sources():
+            return self._local_next_word(source_word, connection_types, category, language, language_level, used_words, rng)
+        
+        candidates: List[Tuple[str, str]] = []
+        
+        try:
+            for _ in range(MAX_WORD_ATTEMPTS):
                 if connection_types:
-                    connection_type = random.choice(connection_types)
-                    prev_word = self._generate_word_with_connection(words[i + 1], connection_type, category, language, language_level, used_words)
+                    connection_type = rng.choice(connection_types)
+                    words = self._generate_word_with_connection(source_word, connection_type, category, language, language_level, rng, used_words)
+                    candidates = [(word, connection_type) for word in words]
                 else:
-                    prev_word, connection_type = self._generate_word_and_connection(words[i + 1], category, language, language_level, used_words)
+                    candidates = self._generate_word_and_connection(source_word, category, language, language_level, rng, used_words)
                 
-                # Check if word is unique
-                if prev_word.lower() not in used_words:
-                    break
-                elif attempt == max_attempts - 1:
-                    print(f"Warning: Could not find unique word after {max_attempts} attempts")
-            
-            connections[i] = connection_type
-            words[i] = prev_word
-            used_words.add(prev_word.lower())
+                for word, connection_type in candidates:
+                    if normalize_word(word, language) not in used_words:
+                        return word, connection_type
+        except UNAVAILABLE_ERRORS:
+            # The API went down during this board
+            return self._local_next_word(source_word, connection_types, category, language, language_level, used_words, rng)
         
-        return {'words': words, 'connections': connections}
+        # Every candidate was taken on every attempt, just use the top one
+        logger.warning("no unique word found", extra={"source_word": source_word, "attempts": MAX_WORD_ATTEMPTS})
+        return candidates[0]
+    
+    def _local_next_word(
+        self,
+        source_word: str,
+        connection_types: Optional[List[str]],
+        category: Optional[str],
+        language: str,
+        language_level: str,
+        used_words: UsedWords,
+        rng: random.Random
+    ) -> Tuple[str, str]:
+        """Next word from the memo or the bundled lexicon, without the LLM"""
+        if self.memo:
+            remembered = self.memo.sample(source_word, connection_types, category, language, language_level, used_words)
+            if remembered:
+                return remembered
+        if (language or "English").lower() == "english":
+            options = [
+                (word, connection) for word, connection in self.lexicon.related_words(source_word, connection_types)
+                if normalize_word(word, language) not in used_words
+            ]
+            if options:
+                return rng.choice(options)
+        raise LLMUnavailable(f"LLM unavailable and no local word is linked to '{source_word}'")
+    
+    def _local_chain(
+        self,
+        length: int,
+        connection_types: Optional[List[str]],
+        language: str,
+        used_words: UsedWords,
+        rng: random.Random,
+        seed_word: Optional[str] = None,
+        seed_position: int = 0
+    ) -> dict:
+        """A whole chain walked through the bundled (English) lexicon; raises LLMUnavailable if none fits"""
+        if (language or "English").lower() != "english":
+            raise LLMUnavailable(f"LLM unavailable and no local lexicon for {language}")
+        if seed_word is not None:
+            starts = [seed_word]
+        else:
+            starts = [word for word in self.lexicon.lexicon_words() if normalize_word(word, language) not in used_words]
+            rng.shuffle(starts)
+        
+        for start in starts[:LOCAL_START_TRIES]:
+            trial = used_words.copy()
+            trial.add(start)
+            budget = [LOCAL_SEARCH_BUDGET]
+            forward = self._local_path(start, length - 1 - seed_position, connection_types, language, trial, rng, budget)
+            backward = forward is not None and self._local_path(start, seed_position, connection_types, language, trial, rng, budget)
+            if forward is None or backward is None:
+                continue
+            used_words.update(trial)
+            # The backward walk runs away from the seed, so it is reversed into chain order
+            backward.reverse()
+            return {
+                'words': [word for word, _ in backward] + [start] + [word for word, _ in forward],
+                'connections': [connection for _, connection in backward] + [connection for _, connection in forward],
+                'local': True
+            }
+        raise LLMUnavailable("LLM unavailable and no local chain fits" + (f" through '{seed_word}'" if seed_word else ""))
+    
+    def _local_path(
+        self,
+        source_word: str,
+        steps: int,
+        connection_types: Optional[List[str]],
+        language: str,
+        used_words: UsedWords,
+        rng: random.Random,
+        budget: List[int],
+        target: Optional[str] = None
+    ) -> Optional[List[Tuple[str, str]]]:
+        """Depth-first walk of `steps` lexicon links from source_word over unused words (adds them to used_words).
+        
+        With a target, the walk must end next to it, and the link to the target
+        is the last element of the path.
+        """
+        if steps == 0:
+            if target is None:
+                return []
+            end = normalize_word(target, language)
+            for word, connection in self.lexicon.related_words(source_word, connection_types):
+                if normalize_word(word, language) == end:
+                    return [(target, connection)]
+            return None
+        options = [
+            (word, connection) for word, connection in self.lexicon.related_words(source_word, connection_types)
+            if normalize_word(word, language) not in used_words
+        ]
+        rng.shuffle(options)
+        for word, connection in options:
+            if budget[0] <= 0:
+                return None
+            budget[0] -= 1
+            used_words.add(word)
+            rest = self._local_path(word, steps - 1, connection_types, language, used_words, rng, budget, target)
+            if rest is not None:
+                return [(word, connection)] + rest
+            used_words.discard(word)
+        return None
     
-    def _generate_word_start(self, category: Optional[str], language: str, language_level: str) -> str:
+    def _generate_word_start(self, category: Optional[str], language: str, language_level: str, rng: random.Random) -> str:
         """Generate a starting word"""
         category_text = f" in the category '{category}'" if category else ""
         prompt = f"Generate a single UNIQUE common {language} word{category_text}. Keep it fit for speakers in {language_level} level. Be creative and varied! Respond with only the word, nothing else."
         
         try:
-            response = self.client.chat.completions.create(
+            content = complete(
+                self.client,
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": "You are a word association expert. Always respond with exactly one UNIQUE word. Be creative and avoid common words."},
@@ -506,11 +1080,13 @@ class BoardGenerator:
                 max_tokens=20
             )
             
-            word = response.choices[0].message.content.strip().lower()
+            word = content.strip().lower()
             word = word.split()[0] if word else "default"
             return word
+        except UNAVAILABLE_ERRORS:
+            raise
         except Exception as e:
-            return f"word{random.randint(1, 1000)}"
+            return f"word{rng.randint(1, 1000)}"
     
     def _generate_word_with_connection(
         self, 
@@ -519,36 +1095,28 @@ class BoardGenerator:
         category: Optional[str],
         language: str,
         language_level: str,
-        used_words: Optional[Set[str]] = None
-    ) -> str:
-        """Generate a word connected to source_word via connection_type"""
+        rng: random.Random,
+        used_words: Optional[UsedWords] = None
+    ) -> List[str]:
+        """Generate ranked candidate words connected to source_word via connection_type"""
         if used_words is None:
-            used_words = set()
-            
-        category_text = f" (in category: {category})" if category else ""
-        avoid_text = ""
-        if used_words:
-            avoid_list = list(used_words)[:20]  # Limit to avoid huge prompts
-            avoid_text = f"\n\nIMPORTANT: Do NOT use any of these already used words: {', '.join(avoid_list)}"
+            used_words = UsedWords(language)
         
-        prompt = f"Given the word '{source_word}', generate a single UNIQUE {language} word connected to it through a {connection_type} relationship{category_text}. Keep it fit for speakers in {language_level} level.{avoid_text}\n\nRespond with only the word, nothing else."
-
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are a word association expert. Always respond with exactly one UNIQUE word that hasn't been used before."},
-                    {"role": "user", "content": prompt}
-                ],
+            words = complete_json_cascade(
+                self.client,
+                messages=word_with_connection_messages(source_word, connection_type, category, language, language_level, used_words),
+                parse=lambda data: clean_words(data.get("words", [])) or None,
                 temperature=1.0,
-                max_tokens=20
+                max_tokens=12 * WORD_CANDIDATES + 16
             )
-            
-            word = response.choices[0].message.content.strip().lower()
-            word = word.split()[0] if word else "default"
-            return word
+            if self.memo:
+                self.memo.record(source_word, connection_type, category, language, language_level, words)
+            return words or ["default"]
+        except UNAVAILABLE_ERRORS:
+            raise
         except Exception as e:
-            return f"word{random.randint(1, 1000)}"
+            return [f"word{rng.randint(1, 1000)}"]
     
     def _generate_word_and_connection(
         self, 
@@ -556,48 +1124,143 @@ class BoardGenerator:
         category: Optional[str],
         language: str,
         language_level: str,
-        used_words: Optional[Set[str]] = None
-    ) -> Tuple[str, str]:
-        """Generate both a connected word and the connection type"""
+        rng: random.Random,
+        used_words: Optional[UsedWords] = None
+    ) -> List[Tuple[str, str]]:
+        """Generate ranked candidate (word, connection type) pairs for source_word"""
         if used_words is None:
-            used_words = set()
-            
+            used_words = UsedWords(language)
+        
+        try:
+            candidates = complete_json_cascade(
+                self.client,
+                messages=word_and_connection_messages(source_word, category, language, language_level, used_words),
+                parse=self._parse_candidates,
+                temperature=1.0,
+                max_tokens=24 * WORD_CANDIDATES + 16
+            )
+            if self.memo:
+                for word, connection in candidates:
+                    self.memo.record(source_word, connection, category, language, language_level, [word])
+            return candidates or [("default", "association")]
+        except UNAVAILABLE_ERRORS:
+            raise
+        except Exception as e:
+            return [(f"word{rng.randint(1, 1000)}", "association")]
+    
+    @staticmethod
+    def _parse_candidates(data: dict) -> Optional[List[Tuple[str, str]]]:
+        candidates = []
+        for item in data.get("candidates", []):
+            word = clean_word(item.get("word", ""))
+            connection = str(item.get("connection", "association")).strip().lower()
+            if word:
+                candidates.append((word, connection or "association"))
+        return candidates or None
+    
+    def _generate_crossing_words(
+        self,
+        count: int,
+        links: List[Tuple[int, int, int]],
+        category: Optional[str],
+        language: str,
+        language_level: str
+    ) -> List[str]:
+        """Pick the words of all crossing cells in one call.
+        
+        links are (crossing, crossing, steps) for crossings that follow each
+        other on a chain, so the model can keep linked words reachable.
+        """
+        if not count:
+            return []
         category_text = f" (in category: {category})" if category else ""
-        avoid_text = ""
-        if used_words:
-            avoid_list = list(used_words)[:20]
-            avoid_text = f"\n\nIMPORTANT: The word must be UNIQUE. Do NOT use any of these already used words: {', '.join(avoid_list)}"
+        ids = [f"c{i}" for i in range(count)]
+        link_text = "\n".join(
+            f"            - {ids[a]} and {ids[b]} are joined by a chain of {steps} association steps" for a, b, steps in links
+        )
         
         prompt = f"""
-            Given the word '{source_word}', generate a UNIQUE related {language} word and describe their connection IN {language}{category_text}.
-            Keep them fit for speakers in {language_level} level.{avoid_text}
+            Pick {count} different UNIQUE common {language} words for the crossing cells {', '.join(ids)} of a word-association puzzle{category_text}.
+            Keep them fit for speakers in {language_level} level. Each crossing word lies on two chains, so choose words with many associations.
+            Linked crossings must be reachable from one another through that many associations:
+{link_text}
 
             Return ONLY in this JSON format:
-            {{"word": "the_related_word", "connection": "type_of_connection_in_{language}"}}
-
-            The connection should be in {language}. Examples of connections: synonym, antonym, category, part-of, used-for, etc.
+            {{"crossings": {{"c0": "word", "c1": "word"}}, "confidence": 0.0 to 1.0, how well the words fit}}
         """
         
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": f"You are a word association expert. Always respond with valid JSON. Generate UNIQUE words and connections in {language}."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=1.0,
-                max_tokens=100,
-                response_format={"type": "json_object"}
-            )
-            
-            import json
-            result = json.loads(response.choices[0].message.content)
-            word = result.get("word", "default").strip().lower()
-            connection = result.get("connection", "association").strip().lower()
-            return word, connection
-        except Exception as e:
-            return f"word{random.randint(1, 1000)}", "association"
+        def parse(data: dict) -> Optional[List[str]]:
+            crossings = data.get("crossings") or {}
+            words = [clean_word(str(crossings.get(cid, ""))) for cid in ids]
+            if not all(words) or len({normalize_word(word, language) for word in words}) < count:
+                return None
+            return words
+        
+        return complete_json_cascade(
+            self.client,
+            messages=[
+                {"role": "system", "content": "You are a word association expert. Always respond with valid JSON containing single UNIQUE words."},
+                {"role": "user", "content": prompt}
+            ],
+            parse=parse,
+            temperature=1.0,
+            max_tokens=12 * count + 32
+        )
     
+    def _generate_bridge(
+        self,
+        start_word: str,
+        end_word: str,
+        length: int,
+        connection_types: Optional[List[str]],
+        category: Optional[str],
+        language: str,
+        language_level: str,
+        used_words: UsedWords
+    ) -> Tuple[List[str], List[str]]:
+        """Words linking two fixed crossing words: length words and length + 1 connections (adds them to used_words)"""
+        category_text = f" (in category: {category})" if category else ""
+        if connection_types:
+            types_text = f"Every connection must be one of: {', '.join(connection_types)}."
+        else:
+            types_text = f"Describe each connection IN {language}, e.g. synonym, antonym, category, part-of, used-for."
+        
+        prompt = f"""
+            Build a word-association chain from '{start_word}' to '{end_word}' with exactly {length} UNIQUE {language} words in between{category_text}.
+            Keep them fit for speakers in {language_level} level. {types_text}
+            Do NOT use '{start_word}' or '{end_word}' as middle words, nor any of these words already on the board: {avoid_list(used_words)}.
+
+            Return ONLY in this JSON format, with {length} words and {length + 1} connections (the first links '{start_word}' to the first word, the last links the last word to '{end_word}'):
+            {{"words": ["word"], "connections": ["connection"], "confidence": 0.0 to 1.0, how well the chain holds together}}
+        """
+        
+        def parse(data: dict) -> Optional[Tuple[List[str], List[str]]]:
+            words = clean_words(data.get("words", []))
+            connections = [str(c).strip().lower() for c in data.get("connections", [])]
+            if len(words) != length or len(connections) != length + 1 or not all(connections):
+                return None
+            if connection_types and any(c not in connection_types for c in connections):
+                return None
+            keys = {normalize_word(word, language) for word in words}
+            ends = {normalize_word(start_word, language), normalize_word(end_word, language)}
+            if len(keys) < length or keys & ends or any(key in used_words for key in keys):
+                return None
+            return words, connections
+        
+        words, connections = complete_json_cascade(
+            self.client,
+            messages=[
+                {"role": "system", "content": f"You are a word association expert. Always respond with valid JSON. Generate UNIQUE words and connections in {language}."},
+                {"role": "user", "content": prompt}
+            ],
+            parse=parse,
+            temperature=1.0,
+            max_tokens=24 * (length + 1) + 16
+        )
+        for word in words:
+            used_words.add(word)
+        return words, connections
+
     def _calculate_positions(
         self,
         overlap_pos: Tuple[int, int],
@@ -0,0 +1,270 @@
+import asyncio
+import json
+import os
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from connection_validator import ConnectionValidator
+from game_logic import BoardGenerator
+from models import Cell, GameBoard, ValidationResult
+
+# Hidden cells (closest to the given ones first) whose hints are prefetched on connect
+HINT_PREFETCH_LIMIT = int(os.getenv("HINT_PREFETCH_LIMIT", "12"))
+
+Pos = Tuple[int, int]
+
+
+class GameSession:
+    """One WebSocket gameplay channel bound to a stored board.
+
+    Client messages:
+        {"type": "guess", "row": 3, "col": 4, "word": "river"}
+        {"type": "hint", "row": 3, "col": 4}
+        {"type": "validate", "stop_at_first_failure": true}
+
+    Server messages: "ready", "verdict" (per connection touching a guess, or
+    per connection during a "validate" run), "hint", "validation_done" and
+    "error". A new guess on a cell cancels the checks still pending for the
+    previous guess on that cell; a new "validate" cancels the running one.
+    Cancelled checks that have not reached their worker thread skip the LLM
+    call; one already in flight cannot be interrupted, so it finishes and its
+    verdict is dropped. Malformed messages get an "error" reply and leave the
+    channel open.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        board: GameBoard,
+        generator: BoardGenerator,
+        validator: ConnectionValidator,
+        language: str = "English",
+        language_level: str = "B1"
+    ):
+        self.websocket = websocket
+        self.board = board
+        self.generator = generator
+        self.validator = validator
+        self.language = language
+        self.language_level = language_level
+
+        self.cells: Dict[Pos, Cell] = {(cell.row, cell.col): cell for cell in board.cells}
+        # Words currently on the player's board: given cells plus guesses
+        self.words: Dict[Pos, str] = {pos: cell.word for pos, cell in self.cells.items() if cell.is_given and cell.word}
+        self.edges_by_cell: Dict[Pos, List[int]] = {}
+        for i, conn in enumerate(board.connections):
+            self.edges_by_cell.setdefault(conn.from_cell, []).append(i)
+            self.edges_by_cell.setdefault(conn.to_cell, []).append(i)
+
+        self.guess_tasks: Dict[Pos, asyncio.Task] = {}
+        self.validation_task: Optional[asyncio.Task] = None
+        self.hints: Dict[Pos, asyncio.Task] = {}
+        self._send_lock = asyncio.Lock()
+        self._pending: Set[asyncio.Task] = set()
+
+    async def send(self, message: dict) -> None:
+        async with self._send_lock:
+            await self.websocket.send_json(message)
+
+    async def run(self) -> None:
+        await self.send({"type": "ready", "board_id": self.board.board_id, "rows": self.board.rows, "cols": self.board.cols})
+        self._prefetch_hints()
+        try:
+            while True:
+                message = await self._receive()
+                if message is None:
+                    continue
+                kind = message.get("type")
+                if kind == "guess":
+                    await self._on_guess(message)
+                elif kind == "hint":
+                    await self._on_hint(message)
+                elif kind == "validate":
+                    self._on_validate(message)
+                else:
+                    await self.send({"type": "error", "detail": f"Unknown message type: {kind}"})
+        except WebSocketDisconnect:
+            pass
+        finally:
+            tasks = list(self.guess_tasks.values()) + list(self.hints.values()) + list(self._pending)
+            if self.validation_task:
+                tasks.append(self.validation_task)
+            for task in tasks:
+                task.cancel()
+
+    async def _receive(self) -> Optional[dict]:
+        """Next client message, or None once an error has been sent back for one that is not a JSON object"""
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+        try:
+            data = json.loads(message.get("text") or message.get("bytes") or "")
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            await self.send({"type": "error", "detail": "Messages must be JSON objects"})
+            return None
+        return data
+
+    def _cell_pos(self, message: dict) -> Optional[Pos]:
+        row, col = message.get("row"), message.get("col")
+        if not isinstance(row, int) or not isinstance(col, int):
+            return None
+        pos = (row, col)
+        return pos if pos in self.cells else None
+
+    async def _on_guess(self, message: dict) -> None:
+        pos = self._cell_pos(message)
+        word = str(message.get("word") or "").strip()
+        if pos is None or self.cells[pos].is_given:
+            await self.send({"type": "error", "detail": "Not a guessable cell"})
+            return
+
+        # The new guess overwrites the old one; its pending checks are no longer wanted
+        previous = self.guess_tasks.pop(pos, None)
+        if previous:
+            previous.cancel()
+        if word:
+            self.words[pos] = word
+        else:
+            self.words.pop(pos, None)
+        self.guess_tasks[pos] = asyncio.create_task(self._check_guess(pos))
+
+    async def _check_guess(self, pos: Pos) -> None:
+        """Validate every connection of the guessed cell whose other end has a word"""
+        edges = [
+            i for i in self.edges_by_cell.get(pos, [])
+            if self.board.connections[i].from_cell in self.words and self.board.connections[i].to_cell in self.words
+        ]
+        cancelled = threading.Event()
+        checks = [asyncio.create_task(self._verdict(i, cancelled)) for i in edges]
+        try:
+            for check in asyncio.as_completed(checks):
+                await self.send(await check)
+        finally:
+            cancelled.set()
+            for check in checks:
+                check.cancel()
+
+    async def _verdict(self, edge: int, cancelled: threading.Event) -> dict:
+        conn = self.board.connections[edge]
+        word1, word2 = self.words[conn.from_cell], self.words[conn.to_cell]
+
+        def validate() -> Optional[ValidationResult]:
+            # Cancelling the task does not stop its thread; skip the LLM call if the guess was replaced while queued
+            if cancelled.is_set():
+                return None
+            return self.validator.validate_connection(word1, word2, conn.connection)
+
+        result = await asyncio.to_thread(validate)
+        if result is None:
+            raise asyncio.CancelledError()
+        return {
+            "type": "verdict",
+            "from_cell": conn.from_cell,
+            "to_cell": conn.to_cell,
+            "word1": word1,
+            "word2": word2,
+            "connection": conn.connection,
+            "status": "deferred" if result.deferred else ("valid" if result.is_valid else "invalid"),
+            "reason": result.reason,
+        }
+
+    def _prefetch_hints(self) -> None:
+        """Fetch hints for the hidden cells nearest to the given ones in one batched call"""
+        queue = deque(pos for pos, cell in self.cells.items() if cell.is_given)
+        seen = set(queue)
+        targets: List[Pos] = []
+        while queue and len(targets) < HINT_PREFETCH_LIMIT:
+            pos = queue.popleft()
+            if not self.cells[pos].is_given and self.cells[pos].word:
+                targets.append(pos)
+            for i in self.edges_by_cell.get(pos, []):
+                conn = self.board.connections[i]
+                for neighbour in (conn.from_cell, conn.to_cell):
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        queue.append(neighbour)
+        if not targets:
+            return
+
+        batch = asyncio.create_task(asyncio.to_thread(
+            self.generator.generate_hints, [self.cells[pos].word for pos in targets], self.language, self.language_level
+        ))
+        self._pending.add(batch)
+        batch.add_done_callback(self._pending.discard)
+        for pos in targets:
+            self.hints[pos] = asyncio.create_task(self._prefetched_hint(pos, batch))
+
+    async def _prefetched_hint(self, pos: Pos, batch: asyncio.Task) -> str:
+        try:
+            # Shielded so that one cancelled hint does not cancel the whole batch
+            hint = (await asyncio.shield(batch))[self.cells[pos].word]
+        except Exception:
+            # The batch failed as a whole; ask for this hint on its own
+            hint = await self._hint(pos)
+        await self.send({"type": "hint", "row": pos[0], "col": pos[1], "hint": hint, "prefetched": True})
+        return hint
+
+    async def _hint(self, pos: Pos) -> str:
+        return await asyncio.to_thread(
+            self.generator.generate_hint, self.cells[pos].word, self.language, self.language_level
+        )
+
+    async def _on_hint(self, message: dict) -> None:
+        pos = self._cell_pos(message)
+        if pos is None or not self.cells[pos].word:
+            await self.send({"type": "error", "detail": "No hint for this cell"})
+            return
+        task = self.hints.get(pos)
+        if task is None or task.cancelled():
+            task = self.hints[pos] = asyncio.create_task(self._hint(pos))
+        # Reply when ready without blocking the receive loop
+        sender = asyncio.create_task(self._send_hint(pos, task))
+        self._pending.add(sender)
+        sender.add_done_callback(self._pending.discard)
+
+    async def _send_hint(self, pos: Pos, task: asyncio.Task) -> None:
+        hint = await asyncio.shield(task)
+        await self.send({"type": "hint", "row": pos[0], "col": pos[1], "hint": hint, "prefetched": False})
+
+    def _on_validate(self, message: dict) -> None:
+        if self.validation_task:
+            self.validation_task.cancel()
+        stop = bool(message.get("stop_at_first_failure", False))
+        self.validation_task = asyncio.create_task(self._validate(stop))
+
+    async def _validate(self, stop_at_first_failure: bool) -> None:
+        """Progressive BFS validation of the player's current board"""
+        cells = [cell.model_copy(update={"word": self.words.get(pos)}) for pos, cell in self.cells.items()]
+        board = self.board.model_copy(update={"cells": cells})
+        loop = asyncio.get_running_loop()
+        verdicts: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        
+        def produce() -> None:
+            # Runs on a worker thread; leaving the loop stops validation after the current BFS level
+            try:
+                for verdict in self.validator.validate_board_bfs(board, stop_at_first_failure=stop_at_first_failure):
+                    if cancelled.is_set():
+                        break
+                    loop.call_soon_threadsafe(verdicts.put_nowait, verdict)
+            finally:
+                loop.call_soon_threadsafe(verdicts.put_nowait, None)
+        
+        loop.run_in_executor(None, produce)
+        is_valid = True
+        try:
+            while True:
+                verdict = await verdicts.get()
+                if verdict is None:
+                    break
+                if verdict.status != "valid":
+                    is_valid = False
+                await self.send({"type": "verdict", **verdict.model_dump()})
+            await self.send({"type": "validation_done", "is_valid": is_valid})
+        finally:
+            cancelled.set()
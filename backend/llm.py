@@ -0,0 +1,598 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+import openai
+from openai import OpenAI
+
+from response_cache import DEFAULT_CACHE_PATH, ResponseCache
+
+# Upper bound on LLM requests in flight across the whole process, shared by
+# single requests, batch workers and the validator
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+# Connection pool shared by every OpenAI call in the process
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", str(LLM_MAX_CONCURRENCY)))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", str(LLM_MAX_CONCURRENCY)))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "120"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "true").lower() in ("1", "true", "yes")
+
+# Model cascade for JSON calls, cheapest first: "model:token_scale,...". Each
+# tier gets the caller's max_tokens times its scale; the last tier's answer is final
+LLM_CASCADE = os.getenv("LLM_CASCADE", "gpt-4o-mini:1,gpt-4o:2")
+# Answers below this self-reported confidence escalate to the next tier
+LLM_CASCADE_MIN_CONFIDENCE = float(os.getenv("LLM_CASCADE_MIN_CONFIDENCE", "0.7"))
+# Latency samples kept per tier for percentiles
+CASCADE_LATENCY_WINDOW = 1000
+
+# Circuit breaker: this many failed or slow calls in a row open it for the
+# cooldown, during which calls fail immediately; then one probe call is let through
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+LLM_BREAKER_SLOW_CALL = float(os.getenv("LLM_BREAKER_SLOW_CALL", "10"))
+# Output tokens a call may ask for within LLM_BREAKER_SLOW_CALL; calls allowed more get proportionally longer
+LLM_BREAKER_SLOW_CALL_TOKENS = int(os.getenv("LLM_BREAKER_SLOW_CALL_TOKENS", "500"))
+
+# Errors that say the API is down or overloaded (as opposed to a bad request)
+OUTAGE_ERRORS = (openai.APIConnectionError, openai.InternalServerError, openai.RateLimitError, httpx.TransportError)
+
+# Prompt plus completion tokens one board may spend; 0 means no limit
+BOARD_TOKEN_BUDGET = int(os.getenv("BOARD_TOKEN_BUDGET", "0"))
+
+# Recorded responses replayed by seeded generation; empty disables recording
+LLM_REPLAY_CACHE_PATH = os.getenv("LLM_REPLAY_CACHE_PATH", DEFAULT_CACHE_PATH)
+
+_llm_budget = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+_client_lock = threading.Lock()
+_client: Optional[OpenAI] = None
+_replay_cache: Optional[ResponseCache] = None
+
+
+class _ReplayScope:
+    """Seed and per-request occurrence counters of one seeded generation (or of one segment of it)"""
+
+    def __init__(self, seed: int, segment: Optional[str] = None):
+        self.seed = seed
+        self.segment = segment
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def next_occurrence(self, request: dict) -> int:
+        fingerprint = json.dumps(request, sort_keys=True, default=str)
+        with self._lock:
+            n = self.counts.get(fingerprint, 0)
+            self.counts[fingerprint] = n + 1
+        return n
+
+
+class LLMUnavailable(Exception):
+    """Raised without calling the API while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker shared by every LLM call in the process"""
+
+    def __init__(self, failures: int = LLM_BREAKER_FAILURES, cooldown: float = LLM_BREAKER_COOLDOWN):
+        self.failures = failures
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls are currently being refused (no probe is due yet)"""
+        with self._lock:
+            return self._opened_at is not None and (
+                self._probing or time.monotonic() - self._opened_at < self.cooldown
+            )
+
+    def allow(self) -> bool:
+        """Whether a call may go out; after the cooldown a single probe is allowed"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            self._probing = True
+            return True
+
+    def release(self) -> None:
+        """End a call without counting it either way (e.g. cut short by a request deadline)"""
+        with self._lock:
+            self._probing = False
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            self._probing = False
+            if ok:
+                self._consecutive = 0
+                self._opened_at = None
+                return
+            self._consecutive += 1
+            if self._opened_at is not None or self._consecutive >= self.failures:
+                # A failed probe restarts the cooldown
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "open": self._opened_at is not None,
+                "consecutive_failures": self._consecutive,
+                "open_for_s": round(time.monotonic() - self._opened_at, 1) if self._opened_at is not None else 0.0,
+            }
+
+
+breaker = CircuitBreaker()
+
+# Failures after which callers should switch to local fallbacks
+UNAVAILABLE_ERRORS = (LLMUnavailable,) + OUTAGE_ERRORS
+
+
+class DeadlineExceeded(LLMUnavailable):
+    """Raised instead of calling the API once the current request's deadline has passed"""
+
+
+# time.monotonic() by which the current request wants its LLM work done
+_deadline: ContextVar[Optional[float]] = ContextVar("llm_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Cap every completion in this context to finish within `seconds` (None: no cap)"""
+    token = _deadline.set(time.monotonic() + seconds if seconds is not None else None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left() -> Optional[float]:
+    """Seconds until the current deadline, or None without one"""
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def deadline_expired() -> bool:
+    remaining = time_left()
+    return remaining is not None and remaining <= 0
+
+
+class TokenBudgetExceeded(LLMUnavailable):
+    """Raised instead of calling the API once the current board has spent its token budget"""
+
+
+class TokenCount:
+    """Prompt and completion tokens spent by one board (or endpoint), from each response's usage"""
+
+    __slots__ = ("calls", "prompt_tokens", "cached_tokens", "completion_tokens", "limit", "_lock")
+
+    def __init__(self, limit: int = 0):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self.limit = limit
+        self._lock = threading.Lock()
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def exhausted(self) -> bool:
+        return bool(self.limit) and self.total_tokens >= self.limit
+
+    def add(self, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> None:
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.cached_tokens += cached_tokens
+            self.completion_tokens += completion_tokens
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "completion_tokens": self.completion_tokens,
+                "total_tokens": self.total_tokens,
+            }
+
+
+class TokenMetrics:
+    """Token totals per endpoint, and per-board totals of finished boards"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, TokenCount] = {}
+        self._boards = TokenCount()
+        self._boards_over_budget = 0
+
+    def endpoint(self, label: str) -> TokenCount:
+        with self._lock:
+            count = self._endpoints.get(label)
+            if count is None:
+                count = self._endpoints[label] = TokenCount()
+            return count
+
+    def record_board(self, board: TokenCount) -> None:
+        usage = board.snapshot()
+        self._boards.add(usage["prompt_tokens"], usage["cached_tokens"], usage["completion_tokens"])
+        with self._lock:
+            self._boards_over_budget += board.exhausted
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = dict(self._endpoints)
+            over_budget = self._boards_over_budget
+        boards = self._boards.snapshot()
+        # Each recorded board counts as one "call" of the board total
+        count = boards.pop("calls")
+        return {
+            "budget_per_board": BOARD_TOKEN_BUDGET,
+            "endpoints": {label: endpoints[label].snapshot() for label in sorted(endpoints)},
+            "boards": {
+                "count": count,
+                "over_budget": over_budget,
+                "mean_total_tokens": round(boards["total_tokens"] / count, 1) if count else 0.0,
+                **boards,
+            },
+        }
+
+
+token_metrics = TokenMetrics()
+
+# Token count of the board being generated, and the endpoint the tokens are booked under
+_board_tokens: ContextVar[Optional[TokenCount]] = ContextVar("llm_board_tokens", default=None)
+_usage_label: ContextVar[str] = ContextVar("llm_usage_label", default="other")
+
+
+@contextmanager
+def board_tokens(limit: Optional[int] = None) -> Iterator[TokenCount]:
+    """Count the tokens of every completion in this context as one board's, capped at limit (default BOARD_TOKEN_BUDGET)"""
+    count = TokenCount(BOARD_TOKEN_BUDGET if limit is None else limit)
+    token = _board_tokens.set(count)
+    try:
+        yield count
+    finally:
+        _board_tokens.reset(token)
+        token_metrics.record_board(count)
+
+
+@contextmanager
+def usage_label(label: str) -> Iterator[None]:
+    """Book the tokens of completions in this context under label (an endpoint)"""
+    token = _usage_label.set(label)
+    try:
+        yield
+    finally:
+        _usage_label.reset(token)
+
+
+def token_budget_exhausted() -> bool:
+    count = _board_tokens.get()
+    return count is not None and count.exhausted
+
+
+def _record_usage(usage: Any) -> None:
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+    # Prompt tokens the provider served from its prefix cache
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", 0) or 0
+    token_metrics.endpoint(_usage_label.get()).add(prompt_tokens, cached_tokens, completion_tokens)
+    count = _board_tokens.get()
+    if count is not None:
+        count.add(prompt_tokens, cached_tokens, completion_tokens)
+
+
+def llm_available() -> bool:
+    """False while the breaker is open, the request's deadline has passed or the board's tokens are spent; callers should go straight to local fallbacks"""
+    return not breaker.is_open and not deadline_expired() and not token_budget_exhausted()
+
+
+def budget_in_use() -> int:
+    """LLM requests currently holding a slot of the process-wide budget"""
+    # BoundedSemaphore keeps its free slots in _value
+    return LLM_MAX_CONCURRENCY - _llm_budget._value
+
+
+_replay_scope: ContextVar[Optional[_ReplayScope]] = ContextVar("llm_replay_scope", default=None)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def get_client() -> OpenAI:
+    """Shared OpenAI client, built on first use over one pooled httpx transport"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                http_client = httpx.Client(
+                    http2=LLM_HTTP2 and _http2_available(),
+                    limits=httpx.Limits(
+                        max_connections=LLM_MAX_CONNECTIONS,
+                        max_keepalive_connections=LLM_MAX_KEEPALIVE,
+                        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+                    ),
+                    timeout=httpx.Timeout(LLM_TIMEOUT, connect=5.0),
+                )
+                _client = OpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    base_url=os.getenv("OPENAI_BASE_URL") or None,
+                    http_client=http_client,
+                )
+    return _client
+
+
+def warm_up(connections: int = 4) -> float:
+    """Open pooled connections ahead of traffic so no board pays TLS setup.
+    
+    Issues cheap concurrent requests through the shared client and returns
+    the elapsed seconds. Raises if the API cannot be reached.
+    """
+    client = get_client()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        list(executor.map(lambda _: client.models.list(), range(connections)))
+    return time.perf_counter() - started
+
+
+def _get_replay_cache() -> Optional[ResponseCache]:
+    global _replay_cache
+    if _replay_cache is None and LLM_REPLAY_CACHE_PATH:
+        with _client_lock:
+            if _replay_cache is None:
+                _replay_cache = ResponseCache(LLM_REPLAY_CACHE_PATH)
+    return _replay_cache
+
+
+@contextmanager
+def replay(seed: int) -> Iterator[None]:
+    """Record (first run) or replay (later runs) every completion made under this seed.
+    
+    Identical requests are told apart by how many times they were made before
+    in the scope, so a run that repeats a prompt replays each answer in turn.
+    """
+    token = _replay_scope.set(_ReplayScope(seed) if _get_replay_cache() else None)
+    try:
+        yield
+    finally:
+        _replay_scope.reset(token)
+
+
+@contextmanager
+def replay_segment(label: str) -> Iterator[None]:
+    """Give the completions of one parallel task of a seeded generation their own occurrence counters.
+    
+    Concurrent tasks may send identical requests; with shared counters, which
+    task replays which answer would depend on thread timing. label must name
+    the task the same way on every run.
+    """
+    scope = _replay_scope.get()
+    token = _replay_scope.set(_ReplayScope(scope.seed, label) if scope is not None else None)
+    try:
+        yield
+    finally:
+        _replay_scope.reset(token)
+
+
+def replaying() -> bool:
+    """Whether completions in this context are being recorded or replayed"""
+    return _replay_scope.get() is not None
+
+
+def use_local_sources() -> bool:
+    """Whether generation should skip the LLM for local fallbacks.
+    
+    True while the LLM is unavailable, except under a seeded replay, whose
+    recorded responses are still served (complete() checks the replay cache
+    before availability).
+    """
+    return not replaying() and not llm_available()
+
+
+def _slow_call_threshold(max_tokens: Optional[int]) -> float:
+    """Seconds after which a successful call counts as slow, stretched for long outputs (batched hints)"""
+    return LLM_BREAKER_SLOW_CALL * max(1.0, (max_tokens or 0) / LLM_BREAKER_SLOW_CALL_TOKENS)
+
+
+def complete(client, **kwargs) -> str:
+    """Run one chat completion under the shared LLM budget and return its text.
+    
+    Raises LLMUnavailable at once while the circuit breaker is open,
+    DeadlineExceeded when the call cannot finish before the current deadline,
+    and TokenBudgetExceeded once the current board has spent its tokens.
+    Replayed responses cost no tokens.
+    """
+    scope = _replay_scope.get()
+    if scope is not None:
+        cache = _get_replay_cache()
+        request = kwargs if scope.segment is None else {"segment": scope.segment, **kwargs}
+        key = cache.key(scope.seed, request, scope.next_occurrence(request))
+        recorded = cache.get(key)
+        if recorded is not None:
+            return recorded
+        # Best-effort determinism on the recording run as well
+        kwargs = {**kwargs, "seed": scope.seed}
+
+    if token_budget_exhausted():
+        raise TokenBudgetExceeded("Board token budget spent")
+
+    remaining = time_left()
+    if remaining is not None:
+        if remaining <= 0:
+            raise DeadlineExceeded("Request deadline passed")
+        # No retries and no waiting past the deadline
+        client = client.with_options(timeout=min(remaining, LLM_TIMEOUT), max_retries=0)
+
+    if not breaker.allow():
+        raise LLMUnavailable("LLM circuit breaker is open")
+    if not _llm_budget.acquire(timeout=remaining):
+        breaker.release()
+        raise DeadlineExceeded("Request deadline passed waiting for an LLM slot")
+    started = time.perf_counter()
+    try:
+        response = client.chat.completions.create(**kwargs)
+    except OUTAGE_ERRORS as e:
+        if deadline_expired():
+            # Cut short by this request's deadline, not a sign of an outage
+            breaker.release()
+            raise DeadlineExceeded("Request deadline passed during an LLM call") from e
+        breaker.record(False)
+        raise
+    except Exception:
+        # The API answered, just not with something usable
+        breaker.record(True)
+        raise
+    finally:
+        _llm_budget.release()
+    # A call that crawls counts against the breaker even though it succeeded
+    breaker.record(time.perf_counter() - started < _slow_call_threshold(kwargs.get("max_tokens")))
+    _record_usage(getattr(response, "usage", None))
+    content = response.choices[0].message.content
+
+    if scope is not None and content is not None:
+        cache.put(key, content)
+    return content
+
+
+class CascadeTier:
+    """One model in the cascade"""
+
+    __slots__ = ("model", "token_scale")
+
+    def __init__(self, model: str, token_scale: float = 1.0):
+        self.model = model
+        self.token_scale = token_scale
+
+
+def parse_cascade(spec: str) -> List[CascadeTier]:
+    tiers = []
+    for part in spec.split(","):
+        model, _, scale = part.strip().partition(":")
+        if model:
+            tiers.append(CascadeTier(model, float(scale) if scale else 1.0))
+    return tiers or [CascadeTier("gpt-4o-mini")]
+
+
+class CascadeMetrics:
+    """Per-tier call counts, escalations and latencies"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiers: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, model: str, latency: float, escalated: bool, failed: bool) -> None:
+        with self._lock:
+            tier = self._tiers.setdefault(model, {
+                "calls": 0, "escalations": 0, "failures": 0,
+                "latencies": deque(maxlen=CASCADE_LATENCY_WINDOW),
+            })
+            tier["calls"] += 1
+            tier["escalations"] += escalated
+            tier["failures"] += failed
+            tier["latencies"].append(latency)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            tiers = {model: (dict(tier), sorted(tier["latencies"])) for model, tier in self._tiers.items()}
+        result = {}
+        for model, (tier, latencies) in tiers.items():
+            def pct(q: float) -> float:
+                return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 1) if latencies else 0.0
+            result[model] = {
+                "calls": tier["calls"],
+                "escalations": tier["escalations"],
+                "failures": tier["failures"],
+                "escalation_rate": round(tier["escalations"] / tier["calls"], 4) if tier["calls"] else 0.0,
+                "latency_ms": {"p50": pct(0.5), "p95": pct(0.95), "max": pct(1.0)},
+            }
+        return result
+
+
+cascade_tiers = parse_cascade(LLM_CASCADE)
+cascade_metrics = CascadeMetrics()
+
+
+def complete_json_cascade(
+    client,
+    messages: List[dict],
+    parse: Callable[[dict], Any],
+    max_tokens: int,
+    min_confidence: Optional[float] = None,
+    **kwargs
+) -> Any:
+    """Run a JSON completion through the model cascade and return parse(reply).
+
+    The prompt should ask for a "confidence" field between 0 and 1. A tier's
+    answer is accepted when it parses (parse() returns something other than
+    None without raising) and its confidence reaches min_confidence; otherwise
+    the next tier is tried. The last tier's parsed answer is accepted as is.
+    Only unparsable or unconfident answers escalate: a failed call (an outage,
+    the deadline, an open breaker) would fail the same way on the next tier,
+    so it propagates at once. When a later tier fails, the most confident
+    answer parsed so far is returned instead.
+    """
+    if min_confidence is None:
+        min_confidence = LLM_CASCADE_MIN_CONFIDENCE
+
+    best: Optional[Tuple[float, Any]] = None
+    for i, tier in enumerate(cascade_tiers):
+        last = i == len(cascade_tiers) - 1
+        started = time.perf_counter()
+        try:
+            content = complete(
+                client,
+                model=tier.model,
+                messages=messages,
+                max_tokens=max(1, int(max_tokens * tier.token_scale)),
+                response_format={"type": "json_object"},
+                **kwargs
+            )
+        except Exception:
+            cascade_metrics.record(tier.model, time.perf_counter() - started, False, True)
+            if best is not None:
+                return best[1]
+            raise
+
+        result, confidence, failed = None, 0.0, False
+        try:
+            data = json.loads(content)
+            confidence = float(data.get("confidence", 0.0))
+            result = parse(data)
+        except Exception:
+            failed = True
+            if last and best is None:
+                cascade_metrics.record(tier.model, time.perf_counter() - started, False, True)
+                raise
+
+        accepted = result is not None and (last or confidence >= min_confidence)
+        cascade_metrics.record(tier.model, time.perf_counter() - started, not accepted, failed)
+        if accepted:
+            return result
+        if result is not None and (best is None or confidence > best[0]):
+            best = (confidence, result)
+
+    if best is not None:
+        return best[1]
+    raise ValueError("No cascade tier returned a usable answer")
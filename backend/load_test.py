@@ -0,0 +1,234 @@
+"""HTTP load test of the API against a stub LLM.
+
+Starts stub_llm.py and one uvicorn process of main:app pointed at it (or
+uses --target), then runs a closed loop of players at each concurrency level:
+every player sends the next request of the endpoint mix as soon as the last
+one returns. For each level it reports requests per second, p50/p95/p99
+latency, error rate, and the server's event-loop lag and thread/LLM
+saturation from /api/metrics/runtime.
+
+Example:
+    python load_test.py --concurrency 1 8 32 64 --duration 20 --llm-latency-ms 300
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import orjson
+
+# Relative weights of the endpoints in a player's traffic: many connection
+# checks and hints per generated board, now and then a full board check
+DEFAULT_MIX = "generate=1,validate=8,validate_board=1,hint=4"
+ENDPOINTS = {
+    "generate": "/api/board/generate",
+    "validate": "/api/connection/validate",
+    "validate_board": "/api/board/validate",
+    "hint": "/api/hint/generate",
+}
+REQUEST_TIMEOUT = 120.0
+STARTUP_TIMEOUT = 30.0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test the API with a realistic endpoint mix")
+    parser.add_argument("--target", help="Base URL of a running server; by default one is started against the stub LLM")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32, 64], help="Concurrent players per level")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per concurrency level")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Endpoint weights, e.g. generate=1,validate=8")
+    parser.add_argument("--num-chains", nargs="+", type=int, default=[3, 5], help="Chain counts of generated boards")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8010, help="Port of the started server (the stub uses port + 1)")
+    parser.add_argument("--json", help="Also write the report to this file")
+    return parser.parse_args()
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint in mix: {name}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+
+def start_servers(args: argparse.Namespace) -> Tuple[str, List[subprocess.Popen]]:
+    """Start the stub LLM and the API server; returns the API base URL and the processes"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    stub_port = args.port + 1
+    stub = subprocess.Popen(
+        [sys.executable, "stub_llm.py", "--port", str(stub_port), "--latency-ms", str(args.llm_latency_ms),
+         "--jitter-ms", str(args.llm_jitter_ms), "--error-rate", str(args.llm_error_rate)],
+        cwd=here
+    )
+    env = dict(
+        os.environ,
+        OPENAI_BASE_URL=f"http://127.0.0.1:{stub_port}/v1",
+        OPENAI_API_KEY="stub",
+        # Measure the LLM-bound paths: no remembered words or recorded responses
+        WORD_MEMO_PATH="",
+        LLM_REPLAY_CACHE_PATH="",
+        LOG_LEVEL="WARNING",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=here, env=env, stdout=subprocess.DEVNULL
+    )
+    return f"http://127.0.0.1:{args.port}", [server, stub]
+
+
+async def wait_ready(client: httpx.AsyncClient) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while True:
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise SystemExit("Server did not start")
+        await asyncio.sleep(0.2)
+
+
+class Traffic:
+    """Builds request bodies from a board generated before the run"""
+
+    def __init__(self, board: dict, mix: Dict[str, float], num_chains: List[int]):
+        self.board = board
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.num_chains = num_chains
+        words = {(cell["row"], cell["col"]): cell["word"] for cell in board["cells"]}
+        self.pairs = [
+            (words[tuple(conn["from_cell"])], words[tuple(conn["to_cell"])], conn["connection"])
+            for conn in board["connections"]
+        ]
+        self.words = [word for word in words.values() if word]
+
+    def next_request(self) -> Tuple[str, dict]:
+        name = random.choices(self.names, self.weights)[0]
+        if name == "generate":
+            body = {"num_chains": random.choice(self.num_chains), "use_templates": random.random() < 0.5}
+        elif name == "validate":
+            word1, word2, connection = random.choice(self.pairs)
+            body = {"word1": word1, "word2": word2, "connection": connection}
+        elif name == "validate_board":
+            body = {"board": self.board}
+        else:
+            body = {"word": random.choice(self.words)}
+        return name, body
+
+
+async def run_level(client: httpx.AsyncClient, traffic: Traffic, concurrency: int, duration: float) -> dict:
+    results: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    await client.get("/api/metrics/runtime", params={"reset": "true"})
+    end = time.monotonic() + duration
+
+    async def player() -> None:
+        while time.monotonic() < end:
+            name, body = traffic.next_request()
+            start = time.perf_counter()
+            try:
+                response = await client.post(ENDPOINTS[name], content=orjson.dumps(body), headers={"Content-Type": "application/json"})
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            results[name].append((time.perf_counter() - start) * 1000)
+            if not ok:
+                errors[name] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(player() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    runtime = (await client.get("/api/metrics/runtime", params={"reset": "true"})).json()
+
+    def summary(latencies: List[float], failed: int) -> dict:
+        latencies = sorted(latencies)
+        return {
+            "requests": len(latencies),
+            "rps": round(len(latencies) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p95_ms": round(percentile(latencies, 95), 1),
+            "p99_ms": round(percentile(latencies, 99), 1),
+            "error_rate": round(failed / len(latencies), 4) if latencies else 0.0,
+        }
+
+    everything = [latency for latencies in results.values() for latency in latencies]
+    return {
+        "concurrency": concurrency,
+        **summary(everything, sum(errors.values())),
+        "endpoints": {name: summary(results[name], errors[name]) for name in sorted(results)},
+        "runtime": runtime,
+    }
+
+
+def print_level(level: dict) -> None:
+    runtime = level["runtime"]
+    lag, threads, in_flight = runtime["loop_lag_ms"], runtime["threads"], runtime["llm_in_flight"]
+    print(
+        f"{level['concurrency']:>5} {level['rps']:>8.1f} {level['p50_ms']:>8.0f} {level['p95_ms']:>8.0f} "
+        f"{level['p99_ms']:>8.0f} {level['error_rate'] * 100:>6.1f}% "
+        f"{lag['p95']:>8.1f} {lag['max']:>8.1f} {threads['peak']:>4}/{threads['limit']:<4} {in_flight['peak']:>4}/{in_flight['limit']:<4}"
+    )
+    for name, stats in level["endpoints"].items():
+        print(
+            f"      {name:<15} n={stats['requests']:<6} p50={stats['p50_ms']:.0f} p95={stats['p95_ms']:.0f} "
+            f"p99={stats['p99_ms']:.0f} errors={stats['error_rate'] * 100:.1f}%"
+        )
+
+
+async def run(args: argparse.Namespace) -> List[dict]:
+    mix = parse_mix(args.mix)
+    processes: List[subprocess.Popen] = []
+    base_url: Optional[str] = args.target
+    if base_url is None:
+        base_url, processes = start_servers(args)
+    try:
+        limits = httpx.Limits(max_connections=max(args.concurrency) + 4, max_keepalive_connections=max(args.concurrency) + 4)
+        async with httpx.AsyncClient(base_url=base_url, timeout=REQUEST_TIMEOUT, limits=limits) as client:
+            await wait_ready(client)
+            board = await client.post("/api/board/generate", json={"num_chains": max(args.num_chains), "use_templates": True})
+            board.raise_for_status()
+            traffic = Traffic(board.json(), mix, args.num_chains)
+
+            print(f"{'conc':>5} {'rps':>8} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'errors':>7} "
+                  f"{'lag_p95':>8} {'lag_max':>8} {'threads':>9} {'llm':>9}")
+            levels = []
+            for concurrency in args.concurrency:
+                level = await run_level(client, traffic, concurrency, args.duration)
+                print_level(level)
+                levels.append(level)
+            return levels
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+
+def main() -> None:
+    args = parse_args()
+    levels = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "wb") as f:
+            f.write(orjson.dumps({"args": vars(args), "levels": levels}, option=orjson.OPT_INDENT_2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,60 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import datetime
+import hmac
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 
 from models import (
     GenerateBoardRequest, ValidateConnectionRequest, ValidateBoardRequest,
-    GameBoard, ValidationResult, BoardValidationResult, HintRequest, HintResult
+    GameBoard, ValidationResult, BoardValidationResult, HintRequest, HintResult,
+    BatchHintRequest, BatchHintResult,
+    BatchGenerateBoardRequest, BoardViewport
 )
 from game_logic import BoardGenerator
 from connection_validator import ConnectionValidator
+from board_corpus import BoardCorpus
+from board_store import BoardStore
+from gameplay import GameSession
+import llm
+from structured_logging import setup_logging
+from fast_responses import dumps, encoded_response, json_response
+from runtime_metrics import RuntimeMonitor
+from sampling_profiler import PROFILER_INTERVAL_MS, collapsed, profiler
 
 load_dotenv()
+setup_logging()
+
+# Token required in the X-Admin-Token header of admin endpoints; unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+# Longest profile one request may ask for, in seconds
+PROFILE_MAX_SECONDS = 120
+
+runtime_monitor = RuntimeMonitor()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    runtime_monitor.start()
+    profiler.loop_thread = threading.get_ident()
+    yield
+    await runtime_monitor.stop()
+
 
-app = FastAPI(title="Word Chain Puzzle API")
+app = FastAPI(title="Word Chain Puzzle API", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def book_llm_tokens(request: Request, call_next):
+    """Book the LLM tokens spent serving a request under its path"""
+    with llm.usage_label(request.url.path):
+        return await call_next(request)
 
 # CORS middleware for frontend
 app.add_middleware(
@@ -22,8 +65,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-board_generator = BoardGenerator()
+board_corpus = BoardCorpus()
+board_generator = BoardGenerator(corpus=board_corpus)
 validator = ConnectionValidator()
+board_store = BoardStore()
+
+# Largest viewport side (in cells) a single tile request may ask for
+MAX_VIEWPORT_SIZE = 128
 
 
 @app.get("/")
@@ -31,26 +79,142 @@ def root():
     return {"message": "Word Chain Puzzle API"}
 
 
+@app.get("/api/ready")
+def ready(connections: int = 4):
+    """Readiness probe: pre-opens pooled LLM connections so the first board skips TLS setup"""
+    try:
+        elapsed = llm.warm_up(connections=max(1, min(connections, llm.LLM_MAX_CONNECTIONS)))
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=f"LLM API unreachable: {e}")
+    return {"ready": True, "warm_up_ms": round(elapsed * 1000, 1)}
+
+
+@app.get("/api/metrics/llm")
+def llm_metrics():
+    """Per-tier calls, latency and escalation rate of the model cascade"""
+    return {
+        "tiers": [tier.model for tier in llm.cascade_tiers],
+        "min_confidence": llm.LLM_CASCADE_MIN_CONFIDENCE,
+        "metrics": llm.cascade_metrics.snapshot(),
+        "breaker": llm.breaker.snapshot(),
+        "tokens": llm.token_metrics.snapshot(),
+    }
+
+
+@app.get("/api/metrics/runtime")
+async def runtime_metrics(reset: bool = False):
+    """Event-loop lag and thread/LLM saturation since the last reset (async, so it answers even when the thread pool is full)"""
+    return runtime_monitor.snapshot(reset=reset)
+
+
+@app.post("/api/admin/profile")
+async def profile(
+    seconds: float = Query(10.0, gt=0, le=PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(PROFILER_INTERVAL_MS, ge=1, le=1000),
+    include_idle: bool = False,
+    format: str = Query("collapsed", pattern="^(collapsed|json)$"),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Sample the stacks of every thread (request threads, pools, event loop) for `seconds`; returns collapsed stacks"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+    try:
+        profiler.start(interval_ms=interval_ms, include_idle=include_idle)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    try:
+        # Async, so waiting holds no worker thread and the loop keeps serving traffic
+        await asyncio.sleep(seconds)
+    finally:
+        stacks = profiler.stop()
+    if format == "json":
+        return {"seconds": seconds, "interval_ms": interval_ms, "samples": profiler.samples, "stacks": stacks}
+    return PlainTextResponse(
+        collapsed(stacks),
+        headers={"Content-Disposition": 'attachment; filename="profile.collapsed"'}
+    )
+
+
 @app.post("/api/board/generate", response_model=GameBoard)
-def generate_board(request: GenerateBoardRequest):
+def generate_board(request: GenerateBoardRequest, http_request: Request):
     """Generate a game board with word chains and connections"""
     try:
-        board = board_generator.generate_board(
-            num_chains=request.num_chains,
-            grid_size=request.grid_size,
-            connection_types=request.connection_types,
-            category=request.category,
-            use_templates=request.use_templates,
-            language=request.language,
-            language_level=request.language_level
-        )
-        return board
+        board = board_generator.generate_board_from_request(request)
+        board_store.put(board)
+        if request.large_board:
+            # Marathon boards are fetched viewport by viewport
+            board = board.model_copy(update={"cells": [], "connections": []})
+        return json_response(http_request, board)
+    except llm.DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except llm.LLMUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/board/generate/batch")
+def generate_boards(request: BatchGenerateBoardRequest):
+    """Generate many boards in parallel, streamed back as NDJSON lines as they finish"""
+    results = board_generator.generate_boards(request.requests, max_workers=request.max_workers)
+    lines = (dumps(result) + b"\n" for result in results)
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+@app.get("/api/board/{board_id}/viewport", response_model=BoardViewport)
+def get_board_viewport(
+    board_id: str,
+    http_request: Request,
+    top: int = Query(0, ge=0),
+    left: int = Query(0, ge=0),
+    height: int = Query(32, ge=1, le=MAX_VIEWPORT_SIZE),
+    width: int = Query(32, ge=1, le=MAX_VIEWPORT_SIZE)
+):
+    """Cells and connections of a generated board inside a viewport rectangle"""
+    stored = board_store.get(board_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Board not found or expired")
+    
+    cells, connections = stored.index.query(top, left, height, width)
+    viewport = BoardViewport(
+        board_id=board_id,
+        top=top,
+        left=left,
+        height=height,
+        width=width,
+        rows=stored.board.rows,
+        cols=stored.board.cols,
+        cells=cells,
+        connections=connections
+    )
+    return json_response(http_request, viewport, etag=True)
+
+
+@app.get("/api/board/corpus", response_model=GameBoard)
+def get_corpus_board(
+    http_request: Request,
+    language: str = "English",
+    language_level: str = "B1",
+    difficulty: str = "medium",
+    daily: bool = False,
+    date: Optional[datetime.date] = None
+):
+    """Serve a pre-generated board from the corpus (random, or the board of the day)"""
+    if daily or date:
+        board = board_corpus.daily_board(language, language_level, difficulty, date)
+    else:
+        board = board_corpus.random_board(language, language_level, difficulty)
+    
+    if board is None:
+        raise HTTPException(status_code=404, detail="No pre-generated boards for these settings")
+    # Stored boards are already serialized GameBoard JSON
+    return encoded_response(http_request, board, etag=True)
+
+
 @app.post("/api/connection/validate", response_model=ValidationResult)
-def validate_connection(request: ValidateConnectionRequest):
+def validate_connection(request: ValidateConnectionRequest, http_request: Request):
     """Check if two words are connected by given relationship"""
     try:
         result = validator.validate_connection(
@@ -58,23 +222,31 @@ def validate_connection(request: ValidateConnectionRequest):
             word2=request.word2,
             connection=request.connection
         )
-        return result
+        return json_response(http_request, result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/board/validate", response_model=BoardValidationResult)
-def validate_board(request: ValidateBoardRequest):
+def validate_board(request: ValidateBoardRequest, http_request: Request):
     """Validate all connections in a board"""
     try:
         result = validator.validate_board(request.board)
-        return result
+        return json_response(http_request, result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/board/validate/stream")
+def validate_board_stream(request: ValidateBoardRequest):
+    """Validate a board outward from its given cells, streaming one NDJSON verdict per connection"""
+    verdicts = validator.validate_board_bfs(request.board, stop_at_first_failure=request.stop_at_first_failure)
+    lines = (dumps(verdict) + b"\n" for verdict in verdicts)
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
 @app.post("/api/hint/generate", response_model=HintResult)
-def generate_hint(request: HintRequest):
+def generate_hint(request: HintRequest, http_request: Request):
     """Generate a hint for a word"""
     try:
         hint = board_generator.generate_hint(
@@ -82,11 +254,40 @@ def generate_hint(request: HintRequest):
             language=request.language,
             language_level=request.language_level
         )
-        return HintResult(word=request.word, hint=hint)
+        return json_response(http_request, HintResult(word=request.word, hint=hint))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/hint/generate/batch", response_model=BatchHintResult)
+def generate_hints(request: BatchHintRequest, http_request: Request):
+    """Generate hints for many words with one LLM call"""
+    try:
+        hints = board_generator.generate_hints(
+            words=request.words,
+            language=request.language,
+            language_level=request.language_level
+        )
+        result = BatchHintResult(hints=[HintResult(word=word, hint=hint) for word, hint in hints.items()])
+        return json_response(http_request, result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
+@app.websocket("/ws/board/{board_id}")
+async def gameplay_channel(websocket: WebSocket, board_id: str, language: str = "English", language_level: str = "B1"):
+    """Gameplay channel for a generated board: guesses, hints and progressive validation"""
+    await websocket.accept()
+    stored = board_store.get(board_id)
+    if stored is None:
+        await websocket.close(code=4404, reason="Board not found or expired")
+        return
+    session = GameSession(websocket, stored.board, board_generator, validator, language, language_level)
+    with llm.usage_label("/ws/board"):
+        await session.run()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,6 +1,14 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Optional
 
+# Limits for regular boards, and for large-board (marathon) mode
+MAX_CHAINS = 10
+MAX_GRID_SIZE = 20
+LARGE_MAX_CHAINS = 200
+LARGE_MAX_GRID_SIZE = 500
+# Words accepted by one batched hint request
+MAX_HINT_BATCH = 50
+
 
 class Cell(BaseModel):
     """Single cell in the grid"""
@@ -17,6 +25,26 @@ class ConnectionBetweenCells(BaseModel):
     connection: str
 
 
+class BoardDegradation(BaseModel):
+    """What a board gave up to meet its deadline or while the LLM was unavailable"""
+    requested_chains: int
+    dropped_chains: int = Field(0, description="Requested chains missing from the board")
+    local_chains: int = Field(0, description="Chains built from the bundled lexicon instead of the LLM")
+    corpus_board: bool = Field(False, description="A pre-generated corpus board was served instead")
+    deadline_exceeded: bool = False
+    llm_unavailable: bool = False
+    token_budget_exceeded: bool = Field(False, description="The board spent BOARD_TOKEN_BUDGET before it was done")
+
+
+class TokenUsage(BaseModel):
+    """LLM tokens spent, as reported in each response's usage (replayed responses cost nothing)"""
+    calls: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = Field(0, description="Prompt tokens served from the provider's prompt cache")
+    completion_tokens: int = 0
+    total_tokens: int = 0
+
+
 class GameBoard(BaseModel):
     """Complete game board structure"""
     rows: int
@@ -24,17 +52,60 @@ class GameBoard(BaseModel):
     cells: List[Cell]
     connections: List[ConnectionBetweenCells]
     category: Optional[str] = None
+    board_id: Optional[str] = Field(None, description="Server-side handle for viewport and gameplay endpoints")
+    seed: Optional[int] = Field(None, description="Seed the board was generated with, if any")
+    degradation: Optional[BoardDegradation] = Field(None, description="Set when the board is smaller or more local than requested")
+    token_usage: Optional[TokenUsage] = Field(None, description="LLM tokens spent generating this board")
 
 
 class GenerateBoardRequest(BaseModel):
     """Request to generate a board"""
-    num_chains: int = Field(..., ge=2, le=10, description="Number of word chains (2-10)")
-    grid_size: int = Field(15, ge=10, le=20, description="Grid size (10-20)")
+    num_chains: int = Field(..., ge=2, description="Number of word chains (2-10, up to 200 with large_board)")
+    grid_size: int = Field(15, ge=10, description="Grid size (10-20, up to 500 with large_board)")
     connection_types: Optional[List[str]] = None
     category: Optional[str] = None
     use_templates: Optional[bool] = Field(False, description="Use preloaded chain templates")
     language: Optional[str] = None
     language_level: Optional[str] = None
+    large_board: bool = Field(False, description="Marathon board: cells are fetched per viewport instead of returned inline")
+    seed: Optional[int] = Field(None, description="Rebuild the same board for the same seed and parameters (LLM responses are recorded and replayed)")
+    deadline_ms: Optional[int] = Field(None, ge=100, le=120000, description="Return within this many milliseconds, dropping or locally filling chains that would not finish")
+    fill_strategy: Optional[str] = Field(None, pattern="^(sequential|intersections)$", description="How template boards are filled: crossing words first with parallel segments, or chain by chain (default from TEMPLATE_FILL_STRATEGY)")
+
+    @model_validator(mode="after")
+    def check_size_limits(self):
+        max_chains, max_grid = (LARGE_MAX_CHAINS, LARGE_MAX_GRID_SIZE) if self.large_board else (MAX_CHAINS, MAX_GRID_SIZE)
+        if self.num_chains > max_chains:
+            raise ValueError(f"num_chains must be at most {max_chains}")
+        if self.grid_size > max_grid:
+            raise ValueError(f"grid_size must be at most {max_grid}")
+        return self
+
+
+class BatchGenerateBoardRequest(BaseModel):
+    """Request to generate many boards at once"""
+    requests: List[GenerateBoardRequest] = Field(..., min_length=1, max_length=500)
+    max_workers: Optional[int] = Field(None, ge=1, le=64, description="Boards generated in parallel")
+
+
+class BatchBoardResult(BaseModel):
+    """One finished board (or its failure) in a batch"""
+    index: int
+    board: Optional[GameBoard] = None
+    error: Optional[str] = None
+
+
+class BoardViewport(BaseModel):
+    """Cells and connections of a stored board inside a viewport rectangle"""
+    board_id: str
+    top: int
+    left: int
+    height: int
+    width: int
+    rows: int
+    cols: int
+    cells: List[Cell]
+    connections: List[ConnectionBetweenCells]
 
 
 class ValidateConnectionRequest(BaseModel):
@@ -47,18 +118,33 @@ class ValidateConnectionRequest(BaseModel):
 class ValidateBoardRequest(BaseModel):
     """Request to validate entire board"""
     board: GameBoard
+    stop_at_first_failure: bool = Field(False, description="Streaming mode: skip edges only reachable through a broken link")
+
+
+class EdgeVerdict(BaseModel):
+    """Validation verdict for one connection, streamed in BFS order from the given cells"""
+    from_cell: tuple[int, int]
+    to_cell: tuple[int, int]
+    word1: Optional[str] = None
+    word2: Optional[str] = None
+    connection: str
+    status: str = Field(..., description="valid, invalid, deferred or skipped")
+    reason: Optional[str] = None
+    depth: int = Field(..., description="BFS distance (in edges) from the nearest given cell")
 
 
 class ValidationResult(BaseModel):
     """Result of validation"""
     is_valid: bool
     reason: Optional[str] = None
+    deferred: bool = Field(False, description="The LLM was unavailable; the connection was not checked")
 
 
 class BoardValidationResult(BaseModel):
     """Result of board validation"""
     is_valid: bool
     invalid_connections: List[dict] = []
+    deferred_connections: List[dict] = []
 
 
 class HintRequest(BaseModel):
@@ -72,3 +158,15 @@ class HintResult(BaseModel):
     """Result containing a hint for a word"""
     word: str
     hint: str
+
+
+class BatchHintRequest(BaseModel):
+    """Request to get hints for many words in one call"""
+    words: List[str] = Field(..., min_length=1, max_length=MAX_HINT_BATCH)
+    language: str = "English"
+    language_level: str = "B1"
+
+
+class BatchHintResult(BaseModel):
+    """Hints for a batch of words, in request order (duplicates removed)"""
+    hints: List[HintResult]
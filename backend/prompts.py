@@ -0,0 +1,113 @@
+"""Prompt building for the per-word LLM calls.
+
+Every prompt is split into a fixed instruction prefix (the system message,
+identical on every call in the process) and a variable suffix (the user
+message) that carries only the call's data, most stable fields first. The
+prefixes are a few hundred tokens at most, under the 1024-token minimum of
+OpenAI's prompt caching, so they are not served from the cache.
+"""
+import os
+from functools import lru_cache
+from typing import List, Optional
+
+from word_utils import UsedWords
+
+# Number of ranked candidates requested per next-word call
+WORD_CANDIDATES = int(os.getenv("WORD_CANDIDATES", "5"))
+# Cap on the used-words list shown to the model (the most recently placed words)
+MAX_AVOID_WORDS = 50
+
+
+@lru_cache(maxsize=None)
+def _word_with_connection_instructions(count: int) -> str:
+    return f"""You are a word association expert. Always respond with valid JSON containing single UNIQUE words that haven't been used before.
+
+The user gives a language, a learner level, an optional category, a connection type, words already used on the board and a source word.
+Generate {count} different UNIQUE words in that language, each connected to the source word through that connection type (and in the category, if one is given).
+Keep them fit for speakers at the learner level. Do NOT use any of the already used words.
+
+Rank them from best to worst and return ONLY in this JSON format:
+{{"words": ["best_word", "second_word", "..."], "confidence": 0.0 to 1.0, how well the best words fit}}"""
+
+
+@lru_cache(maxsize=None)
+def _word_and_connection_instructions(count: int) -> str:
+    return f"""You are a word association expert. Always respond with valid JSON. Generate UNIQUE words and connections in the requested language.
+
+The user gives a language, a learner level, an optional category, words already used on the board and a source word.
+Generate {count} different UNIQUE words in that language related to the source word (and in the category, if one is given), and describe each connection IN that language.
+Keep them fit for speakers at the learner level. Do NOT use any of the already used words.
+Examples of connections: synonym, antonym, category, part-of, used-for, etc.
+
+Rank them from best to worst and return ONLY in this JSON format:
+{{"candidates": [{{"word": "the_related_word", "connection": "type_of_connection_in_the_language"}}], "confidence": 0.0 to 1.0, how well the best candidates fit}}"""
+
+
+VALIDATION_INSTRUCTIONS = """You are a linguistic expert validating word relationships.
+
+The user gives a connection type and two words. Determine if there is a valid relationship of that type between the two words.
+
+Return the result in the following JSON format:
+{
+    "is_valid": true or false,
+    "reason": "brief explanation",
+    "confidence": 0.0 to 1.0, how sure you are
+}"""
+
+
+def avoid_list(used_words: UsedWords) -> str:
+    """The most recently placed used words for a prompt, as placed (not their dedupe keys).
+    
+    On big boards the model only sees the last MAX_AVOID_WORDS, the ones
+    nearest the source word and likeliest to come back.
+    """
+    return ", ".join(used_words.recent(MAX_AVOID_WORDS)) or "(none)"
+
+
+def word_with_connection_messages(
+    source_word: str,
+    connection_type: str,
+    category: Optional[str],
+    language: str,
+    language_level: str,
+    used_words: UsedWords,
+    count: int = WORD_CANDIDATES
+) -> List[dict]:
+    return [
+        {"role": "system", "content": _word_with_connection_instructions(count)},
+        {"role": "user", "content": (
+            f"Language: {language or 'English'}\n"
+            f"Level: {language_level or 'B1'}\n"
+            f"Category: {category or '(any)'}\n"
+            f"Connection type: {connection_type}\n"
+            f"Already used: {avoid_list(used_words)}\n"
+            f"Source word: {source_word}"
+        )},
+    ]
+
+
+def word_and_connection_messages(
+    source_word: str,
+    category: Optional[str],
+    language: str,
+    language_level: str,
+    used_words: UsedWords,
+    count: int = WORD_CANDIDATES
+) -> List[dict]:
+    return [
+        {"role": "system", "content": _word_and_connection_instructions(count)},
+        {"role": "user", "content": (
+            f"Language: {language or 'English'}\n"
+            f"Level: {language_level or 'B1'}\n"
+            f"Category: {category or '(any)'}\n"
+            f"Already used: {avoid_list(used_words)}\n"
+            f"Source word: {source_word}"
+        )},
+    ]
+
+
+def validation_messages(word1: str, word2: str, connection: str) -> List[dict]:
+    return [
+        {"role": "system", "content": VALIDATION_INSTRUCTIONS},
+        {"role": "user", "content": f"Connection type: {connection}\nWord 1: {word1}\nWord 2: {word2}"},
+    ]
@@ -0,0 +1,269 @@
+import json
+import os
+import re
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from models import ValidationResult
+from word_utils import normalize_word, strip_accents
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "lexicon.json")
+
+# Connection labels the rule chain understands, mapped to a check name
+CONNECTION_ALIASES: Dict[str, str] = {
+    "synonym": "synonym",
+    "synonyms": "synonym",
+    "sinonimo": "synonym",
+    "antonym": "antonym",
+    "antonyms": "antonym",
+    "opposite": "antonym",
+    "antonimo": "antonym",
+    "rhyme": "rhyme",
+    "rhymes": "rhyme",
+    "rima": "rhyme",
+    "anagram": "anagram",
+    "anagrams": "anagram",
+    "compound": "compound",
+    "compound word": "compound",
+    "compound words": "compound",
+    "shared prefix": "shared_prefix",
+    "same prefix": "shared_prefix",
+    "prefix": "prefix",
+    "shared suffix": "shared_suffix",
+    "same suffix": "shared_suffix",
+    "suffix": "suffix",
+}
+
+# Affixes a shared prefix/suffix connection is confirmed on, longest first
+PREFIXES = (
+    "under", "inter", "super", "trans", "over", "anti", "fore",
+    "mis", "non", "pre", "dis", "sub", "out", "un", "re", "in", "im", "de", "co", "ex",
+)
+SUFFIXES = (
+    "ness", "ment", "tion", "sion", "able", "ible", "less", "ship", "hood",
+    "ful", "ous", "ish", "ist", "ism", "ity", "ive", "est", "ing", "er", "ly", "ed", "al",
+)
+# Shortest stem left once an affix is taken off ('un' + 'do')
+MIN_STEM_LENGTH = 2
+
+
+def _letters(word: str) -> str:
+    return re.sub(r"[^a-z]", "", strip_accents(word.casefold()))
+
+
+def connection_kind(connection: str) -> Optional[str]:
+    """Check name for a connection label ('Compound words' -> 'compound'), if the rules know it"""
+    label = re.sub(r"[\s_-]+", " ", strip_accents(connection.casefold())).strip()
+    return CONNECTION_ALIASES.get(label)
+
+
+def _suffix_stems(word: str, suffix: str) -> List[str]:
+    """Spellings the stem may have had before suffix was added ('happiness' -> 'happi', 'happy')"""
+    stem = word[:-len(suffix)]
+    stems = [stem, stem + "e"]
+    if stem.endswith("i"):
+        stems.append(stem[:-1] + "y")
+    # 'running' -> 'run'
+    if len(stem) > 2 and stem[-1] == stem[-2]:
+        stems.append(stem[:-1])
+    return stems
+
+
+class RuleValidator:
+    """Rule-based checks that run before the LLM.
+
+    Every decision is a set or dict lookup on indexes built once from the
+    bundled lexicon. validate() returns None whenever the rules cannot decide
+    with confidence, so the caller falls through to the model.
+    """
+
+    def __init__(self, lexicon_path: Optional[str] = None):
+        with open(lexicon_path or DEFAULT_LEXICON_PATH, encoding="utf-8") as f:
+            lexicon = json.load(f)
+
+        self.synonym_lists: List[List[str]] = lexicon.get("synonyms", [])
+        # word -> ids of the synonym groups it belongs to
+        self.synonym_groups: Dict[str, Set[int]] = {}
+        for group_id, group in enumerate(self.synonym_lists):
+            for word in group:
+                self.synonym_groups.setdefault(normalize_word(word), set()).add(group_id)
+
+        self.antonym_pairs: Set[FrozenSet[str]] = {
+            frozenset((normalize_word(a), normalize_word(b))) for a, b in lexicon.get("antonyms", [])
+        }
+        self.antonyms: Dict[str, Set[str]] = {}
+        for a, b in lexicon.get("antonyms", []):
+            self.antonyms.setdefault(normalize_word(a), set()).add(b)
+            self.antonyms.setdefault(normalize_word(b), set()).add(a)
+
+        # compound -> (head, tail), plus every component -> compounds it appears in
+        self.compounds: Dict[str, Tuple[str, str]] = {}
+        self.compound_parts: Dict[str, Set[str]] = {}
+        # word -> words it forms a compound with ('sun' -> 'flower', 'light')
+        self.compound_partners: Dict[str, Set[str]] = {}
+        for head, tail in lexicon.get("compounds", []):
+            self.compound_partners.setdefault(_letters(head), set()).add(tail)
+            self.compound_partners.setdefault(_letters(tail), set()).add(head)
+            compound = _letters(head + tail)
+            self.compounds[compound] = (_letters(head), _letters(tail))
+            self.compound_parts.setdefault(_letters(head), set()).add(compound)
+            self.compound_parts.setdefault(_letters(tail), set()).add(compound)
+
+        # word -> id of its rhyme group; every group is one rhyme sound
+        self.rhyme_groups: Dict[str, int] = {}
+        for group_id, group in enumerate(lexicon.get("rhymes", [])):
+            for word in group:
+                self.rhyme_groups[normalize_word(word)] = group_id
+
+        # Known words an affix may be taken off, to tell 'un' + 'happy' from 'un' + 'cle'
+        self.stems: Set[str] = {_letters(word) for word in self.lexicon_words() + lexicon.get("stems", [])}
+        self.stems.update(self.compound_partners)
+
+        self.checks: Dict[str, Callable[[str, str], Optional[ValidationResult]]] = {
+            "synonym": self._check_synonym,
+            "antonym": self._check_antonym,
+            "rhyme": self._check_rhyme,
+            "anagram": self._check_anagram,
+            "compound": self._check_compound,
+            "shared_prefix": self._check_prefix,
+            "shared_suffix": self._check_suffix,
+            "prefix": self._check_prefixed,
+            "suffix": self._check_suffixed,
+        }
+
+    def validate(self, word1: str, word2: str, connection: str) -> Optional[ValidationResult]:
+        """Decide the connection locally, or return None to defer to the LLM"""
+        check = self.checks.get(connection_kind(connection) or "")
+        # Non-Latin scripts have no letters to compare, leave them to the LLM
+        if check is None or not _letters(word1) or not _letters(word2):
+            return None
+        return check(word1, word2)
+
+    def related_words(self, word: str, connection_types: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+        """(word, connection) pairs the lexicon links to word, for generating without the LLM.
+        
+        Only synonym, antonym and compound relations are known; with
+        connection_types, only those kinds are returned, under the caller's label.
+        """
+        labels = {"synonym": "synonym", "antonym": "antonym", "compound": "compound"}
+        if connection_types:
+            labels = {}
+            for connection in connection_types:
+                kind = connection_kind(connection)
+                if kind in ("synonym", "antonym", "compound"):
+                    labels.setdefault(kind, connection)
+
+        key = normalize_word(word)
+        related: List[Tuple[str, str]] = []
+        if "synonym" in labels:
+            for group_id in sorted(self.synonym_groups.get(key, ())):
+                related.extend((other, labels["synonym"]) for other in self.synonym_lists[group_id])
+        if "antonym" in labels:
+            related.extend((other, labels["antonym"]) for other in sorted(self.antonyms.get(key, ())))
+        if "compound" in labels:
+            related.extend((other, labels["compound"]) for other in sorted(self.compound_partners.get(_letters(word), ())))
+        return [(other, label) for other, label in related if normalize_word(other) != key]
+
+    def lexicon_words(self) -> List[str]:
+        """Every word the lexicon relates to at least one other word"""
+        words = {word for group in self.synonym_lists for word in group}
+        for partners in list(self.antonyms.values()) + list(self.compound_partners.values()):
+            words.update(partners)
+        return sorted(words)
+
+    def _are_synonyms(self, a: str, b: str) -> bool:
+        return bool(self.synonym_groups.get(a, set()) & self.synonym_groups.get(b, set()))
+
+    def _check_synonym(self, word1: str, word2: str) -> Optional[ValidationResult]:
+        a, b = normalize_word(word1), normalize_word(word2)
+        if a == b:
+            return None
+        if self._are_synonyms(a, b):
+            return ValidationResult(is_valid=True, reason=f"'{word1}' and '{word2}' are listed as synonyms")
+        if frozenset((a, b)) in self.antonym_pairs:
+            return ValidationResult(is_valid=False, reason=f"'{word1}' and '{word2}' are opposites, not synonyms")
+        return None
+
+    def _check_antonym(self, word1: str, word2: str) -> Optional[ValidationResult]:
+        a, b = normalize_word(word1), normalize_word(word2)
+        if a == b:
+            return None
+        if frozenset((a, b)) in self.antonym_pairs:
+            return ValidationResult(is_valid=True, reason=f"'{word1}' and '{word2}' are listed as antonyms")
+        if self._are_synonyms(a, b):
+            return ValidationResult(is_valid=False, reason=f"'{word1}' and '{word2}' are synonyms, not opposites")
+        return None
+
+    def _check_rhyme(self, word1: str, word2: str) -> Optional[ValidationResult]:
+        a, b = normalize_word(word1), normalize_word(word2)
+        # Spelling does not tell rhymes (love/move, cough/though), only the rhyme groups do
+        if a == b or a not in self.rhyme_groups or b not in self.rhyme_groups:
+            return None
+        if self.rhyme_groups[a] == self.rhyme_groups[b]:
+            return ValidationResult(is_valid=True, reason=f"'{word1}' and '{word2}' are listed as rhymes")
+        return ValidationResult(is_valid=False, reason=f"'{word1}' and '{word2}' end in different sounds")
+
+    def _check_anagram(self, word1: str, word2: str) -> Optional[ValidationResult]:
+        a, b = _letters(word1), _letters(word2)
+        if a and a != b and sorted(a) == sorted(b):
+            return ValidationResult(is_valid=True, reason=f"'{word1}' and '{word2}' use exactly the same letters")
+        return ValidationResult(is_valid=False, reason=f"'{word1}' and '{word2}' are not anagrams of each other")
+
+    def _check_compound(self, word1: str, word2: str) -> Optional[ValidationResult]:
+        a, b = _letters(word1), _letters(word2)
+        for compound in (a + b, b + a):
+            if compound in self.compounds:
+                return ValidationResult(is_valid=True, reason=f"'{word1}' and '{word2}' form '{compound}'")
+        # One word is a compound built from the other ('sun' -> 'sunflower')
+        if b in self.compound_parts.get(a, set()) or a in self.compound_parts.get(b, set()):
+            return ValidationResult(is_valid=True, reason=f"'{word1}' and '{word2}' share a compound word part")
+        return None
+
+    def _known_stem(self, stems: List[str]) -> bool:
+        return any(len(stem) >= MIN_STEM_LENGTH and stem in self.stems for stem in stems)
+
+    def _check_prefix(self, word1: str, word2: str) -> Optional[ValidationResult]:
+        a, b = _letters(word1), _letters(word2)
+        if a == b:
+            return None
+        for prefix in PREFIXES:
+            if a.startswith(prefix) and b.startswith(prefix) and \
+                    self._known_stem([a[len(prefix):]]) and self._known_stem([b[len(prefix):]]):
+                return ValidationResult(is_valid=True, reason=f"'{word1}' and '{word2}' both take the prefix '{prefix}-'")
+        if a[:1] != b[:1]:
+            return ValidationResult(is_valid=False, reason=f"'{word1}' and '{word2}' do not start the same way")
+        # Shared letters alone (car/cart) are not a prefix; leave it to the LLM
+        return None
+
+    def _check_prefixed(self, word1: str, word2: str) -> Optional[ValidationResult]:
+        """A bare 'prefix' link: one word is the other plus a prefix (happy/unhappy), or both share one"""
+        a, b = _letters(word1), _letters(word2)
+        for prefix in PREFIXES:
+            for stem, derived in ((a, b), (b, a)):
+                if len(stem) >= MIN_STEM_LENGTH and derived == prefix + stem:
+                    return ValidationResult(is_valid=True, reason=f"'{derived}' is '{stem}' with the prefix '{prefix}-'")
+        shared = self._check_prefix(word1, word2)
+        # Words that start differently may still be linked by a prefix some other way; only a confirmation is safe
+        return shared if shared is not None and shared.is_valid else None
+
+    def _check_suffix(self, word1: str, word2: str) -> Optional[ValidationResult]:
+        a, b = _letters(word1), _letters(word2)
+        if a == b:
+            return None
+        for suffix in SUFFIXES:
+            if a.endswith(suffix) and b.endswith(suffix) and \
+                    self._known_stem(_suffix_stems(a, suffix)) and self._known_stem(_suffix_stems(b, suffix)):
+                return ValidationResult(is_valid=True, reason=f"'{word1}' and '{word2}' both take the suffix '-{suffix}'")
+        if a[-1:] != b[-1:]:
+            return ValidationResult(is_valid=False, reason=f"'{word1}' and '{word2}' do not end the same way")
+        # Shared letters alone (nation/lion) are not a suffix; leave it to the LLM
+        return None
+
+    def _check_suffixed(self, word1: str, word2: str) -> Optional[ValidationResult]:
+        """A bare 'suffix' link: one word is the other plus a suffix (kind/kindness), or both share one"""
+        a, b = _letters(word1), _letters(word2)
+        for suffix in SUFFIXES:
+            for stem, derived in ((a, b), (b, a)):
+                if len(stem) >= MIN_STEM_LENGTH and derived.endswith(suffix) and stem in _suffix_stems(derived, suffix):
+                    return ValidationResult(is_valid=True, reason=f"'{derived}' is '{stem}' with the suffix '-{suffix}'")
+        shared = self._check_suffix(word1, word2)
+        return shared if shared is not None and shared.is_valid else None
@@ -0,0 +1,86 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from anyio import to_thread
+
+import llm
+
+# How often the event loop is probed for scheduling lag
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+# Lag samples kept for percentiles
+LOOP_LAG_WINDOW = 3000
+
+
+class RuntimeMonitor:
+    """Event-loop lag and worker-thread saturation of the running server.
+
+    A probe task sleeps LOOP_LAG_INTERVAL and records how late it woke up,
+    which is the time the loop spent running other callbacks. Each probe also
+    samples the threads borrowed from the pool that runs sync endpoints and the
+    LLM calls in flight, so peaks between two snapshots are not missed.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self.lag_ms: Deque[float] = deque(maxlen=LOOP_LAG_WINDOW)
+        self.peak_threads = 0
+        self.peak_llm_in_flight = 0
+        self.since = time.time()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._probe())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _probe(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - start - self.interval) * 1000
+            threads = to_thread.current_default_thread_limiter().borrowed_tokens
+            in_flight = llm.budget_in_use()
+            with self._lock:
+                self.lag_ms.append(lag)
+                self.peak_threads = max(self.peak_threads, threads)
+                self.peak_llm_in_flight = max(self.peak_llm_in_flight, in_flight)
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        """Current and peak saturation since the last reset"""
+        limiter = to_thread.current_default_thread_limiter()
+        with self._lock:
+            lags = sorted(self.lag_ms)
+            result = {
+                "window_s": round(time.time() - self.since, 3),
+                "loop_lag_ms": {
+                    "samples": len(lags),
+                    "p50": round(lags[len(lags) // 2], 2) if lags else 0.0,
+                    "p95": round(lags[int(len(lags) * 0.95)], 2) if lags else 0.0,
+                    "max": round(lags[-1], 2) if lags else 0.0,
+                },
+                "threads": {
+                    "busy": limiter.borrowed_tokens,
+                    "peak": self.peak_threads,
+                    "limit": limiter.total_tokens,
+                },
+                "llm_in_flight": {
+                    "current": llm.budget_in_use(),
+                    "peak": self.peak_llm_in_flight,
+                    "limit": llm.LLM_MAX_CONCURRENCY,
+                },
+            }
+            if reset:
+                self._reset()
+        return result
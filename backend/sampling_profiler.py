@@ -0,0 +1,116 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# Default and smallest time between two samples, in milliseconds
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "10"))
+PROFILER_MIN_INTERVAL_MS = 1.0
+# Innermost frames kept per stack
+PROFILER_MAX_DEPTH = 128
+
+# Pool worker names end in counters ("ThreadPoolExecutor-3_7", "AnyIO worker thread"); strip them so stacks merge
+_THREAD_NUMBER = re.compile(r"[-_ ]?\d+(_\d+)?$")
+
+Frame = Tuple[str, str]  # (file name, function)
+
+# Innermost frames of an event loop waiting for I/O (the asyncio selector, or uvloop's C loop below runners.run)
+_LOOP_IDLE = {("selectors.py", "select"), ("runners.py", "run"), ("base_events.py", "run_until_complete")}
+
+
+def _is_idle(stack: List[Frame]) -> bool:
+    """An event loop with nothing to run, or a pool or logging thread blocked waiting for its next item"""
+    if stack and stack[-1] in _LOOP_IDLE:
+        return True
+    if stack and stack[-1] == ("thread.py", "_worker"):
+        # ThreadPoolExecutor workers wait in the C SimpleQueue.get, below any Python frame
+        return True
+    return any(frame == ("queue.py", "get") for frame in stack)
+
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler over every thread of the process.
+
+    A daemon thread reads sys._current_frames() every interval and counts each
+    thread's stack, so request threads, worker pools and the event loop are
+    all covered without instrumenting them. Threads waiting for work, and the
+    event loop waiting in its selector, are skipped unless include_idle is
+    set; threads blocked on I/O (LLM calls) are kept, since that is time a
+    request spends waiting. Results are collapsed stacks
+    ("thread;file:function;... count"), the input format of flamegraph.pl and
+    speedscope. One profile runs at a time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.loop_thread: Optional[int] = None
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.interval = PROFILER_INTERVAL_MS / 1000
+        self.include_idle = False
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self, interval_ms: float = PROFILER_INTERVAL_MS, include_idle: bool = False) -> None:
+        with self._lock:
+            if self._thread is not None:
+                raise RuntimeError("A profile is already running")
+            self.stacks = Counter()
+            self.samples = 0
+            self.interval = max(interval_ms, PROFILER_MIN_INTERVAL_MS) / 1000
+            self.include_idle = include_idle
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._sample_loop, name="sampling-profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> Dict[str, int]:
+        """Stop sampling and return the collapsed stacks with their sample counts"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+        return dict(self.stacks.most_common())
+
+    def _thread_label(self, ident: int, names: Dict[int, str]) -> str:
+        if ident == self.loop_thread:
+            return "event-loop"
+        return _THREAD_NUMBER.sub("", names.get(ident, "thread")) or "thread"
+
+    def _sample_loop(self) -> None:
+        own = threading.get_ident()
+        next_at = time.perf_counter()
+        while not self._stop.is_set():
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack: List[Frame] = []
+                while frame is not None and len(stack) < PROFILER_MAX_DEPTH:
+                    code = frame.f_code
+                    stack.append((os.path.basename(code.co_filename), code.co_name))
+                    frame = frame.f_back
+                stack.reverse()
+                if not self.include_idle and _is_idle(stack):
+                    continue
+                key = ";".join([self._thread_label(ident, names)] + [f"{file}:{func}" for file, func in stack])
+                self.stacks[key] += 1
+            self.samples += 1
+            # Keep a steady rate: sleep only what is left of this interval
+            next_at += self.interval
+            self._stop.wait(max(0.0, next_at - time.perf_counter()))
+
+
+def collapsed(stacks: Dict[str, int]) -> str:
+    """Render stacks as collapsed-stack text, one "stack count" per line"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.items())
+
+
+profiler = SamplingProfiler()
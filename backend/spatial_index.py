@@ -0,0 +1,58 @@
+import os
+from typing import Dict, List, Set, Tuple
+
+from models import Cell, ConnectionBetweenCells, GameBoard
+
+# Side length (in cells) of one spatial bucket
+TILE_SIZE = int(os.getenv("SPATIAL_TILE_SIZE", "16"))
+
+
+class SpatialIndex:
+    """Bucket grid over a board's cells and connections.
+
+    Cells go into the tile that contains them; a connection goes into the
+    tiles of both its endpoints, so a viewport query only visits the tiles it
+    overlaps instead of the whole board.
+    """
+
+    def __init__(self, board: GameBoard, tile_size: int = TILE_SIZE):
+        self.board = board
+        self.tile_size = tile_size
+        self.cell_tiles: Dict[Tuple[int, int], List[int]] = {}
+        self.edge_tiles: Dict[Tuple[int, int], List[int]] = {}
+
+        for i, cell in enumerate(board.cells):
+            self.cell_tiles.setdefault(self._tile(cell.row, cell.col), []).append(i)
+
+        for i, conn in enumerate(board.connections):
+            from_tile = self._tile(*conn.from_cell)
+            to_tile = self._tile(*conn.to_cell)
+            self.edge_tiles.setdefault(from_tile, []).append(i)
+            if to_tile != from_tile:
+                self.edge_tiles.setdefault(to_tile, []).append(i)
+
+    def _tile(self, row: int, col: int) -> Tuple[int, int]:
+        return row // self.tile_size, col // self.tile_size
+
+    def query(self, top: int, left: int, height: int, width: int) -> Tuple[List[Cell], List[ConnectionBetweenCells]]:
+        """Cells inside the rectangle, and connections with at least one end inside it"""
+        bottom, right = top + height, left + width
+
+        def inside(row: int, col: int) -> bool:
+            return top <= row < bottom and left <= col < right
+
+        cells: List[Cell] = []
+        edge_ids: Set[int] = set()
+        for tile_row in range(top // self.tile_size, (bottom - 1) // self.tile_size + 1):
+            for tile_col in range(left // self.tile_size, (right - 1) // self.tile_size + 1):
+                for i in self.cell_tiles.get((tile_row, tile_col), ()):
+                    cell = self.board.cells[i]
+                    if inside(cell.row, cell.col):
+                        cells.append(cell)
+                for i in self.edge_tiles.get((tile_row, tile_col), ()):
+                    conn = self.board.connections[i]
+                    if inside(*conn.from_cell) or inside(*conn.to_cell):
+                        edge_ids.add(i)
+
+        connections = [self.board.connections[i] for i in sorted(edge_ids)]
+        return cells, connections
@@ -0,0 +1,105 @@
+import atexit
+import contextlib
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import uuid
+import zlib
+from typing import Iterator, Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Share of boards whose DEBUG records are kept (whole boards are kept or dropped)
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+board_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("board_id", default=None)
+
+# Attributes every LogRecord has; anything else came in through extra=
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+@contextlib.contextmanager
+def board_context(board_id: Optional[str] = None) -> Iterator[str]:
+    """Tag every record logged inside the block with a board correlation ID"""
+    board_id = board_id or uuid.uuid4().hex[:12]
+    token = board_id_var.set(board_id)
+    try:
+        yield board_id
+    finally:
+        board_id_var.reset(token)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with extra= fields inlined"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if record.board_id:
+            entry["board_id"] = record.board_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key != "board_id":
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class _BoardSampler(logging.Filter):
+    """Attach the board ID and drop DEBUG records of unsampled boards"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        board_id = board_id_var.get()
+        record.board_id = board_id
+        if record.levelno > logging.DEBUG or LOG_SAMPLE_RATE >= 1.0 or board_id is None:
+            return True
+        return zlib.crc32(board_id.encode()) / 0xFFFFFFFF < LOG_SAMPLE_RATE
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands raw records to the listener thread; never formats or blocks the caller"""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the listener thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _NonBlockingQueueHandler.dropped += 1
+
+
+def setup_logging() -> None:
+    """Route the 'cix' loggers through a bounded queue to a JSON stdout writer thread"""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    handler = _NonBlockingQueueHandler(log_queue)
+    handler.addFilter(_BoardSampler())
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    logger = logging.getLogger("cix")
+    logger.setLevel(LOG_LEVEL)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -0,0 +1,111 @@
+"""Stub OpenAI-compatible chat completions server for load tests.
+
+Answers every prompt the backend sends (words, candidates, crossings,
+bridges, validation, hints) with well-formed replies built from the bundled
+lexicon, after a configurable delay, so the backend can be load tested
+without the OpenAI API. Point the backend at it with OPENAI_BASE_URL.
+
+Example:
+    python stub_llm.py --port 8100 --latency-ms 300 --jitter-ms 100
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=stub uvicorn main:app
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import time
+import uuid
+
+import orjson
+from fastapi import FastAPI, Request, Response
+
+from rule_validators import RuleValidator
+
+# Delay of every completion: latency plus up to +/- jitter, in milliseconds
+STUB_LLM_LATENCY_MS = float(os.getenv("STUB_LLM_LATENCY_MS", "300"))
+STUB_LLM_JITTER_MS = float(os.getenv("STUB_LLM_JITTER_MS", "100"))
+# Share of completions answered with a 500, to exercise retries and the breaker
+STUB_LLM_ERROR_RATE = float(os.getenv("STUB_LLM_ERROR_RATE", "0"))
+# Share of validations answered as invalid
+STUB_LLM_INVALID_RATE = 0.1
+
+WORDS = RuleValidator().lexicon_words()
+
+app = FastAPI(title="Stub LLM")
+
+
+def _words(n: int) -> list:
+    return random.sample(WORDS, n)
+
+
+def _reply(prompt: str) -> str:
+    """Content of a completion for one of the backend's prompts"""
+    if '"hints"' in prompt:
+        words = re.findall(r"^\s*- (\S+)$", prompt, re.M)
+        return orjson.dumps({"hints": {word: f"A common word, related to {random.choice(WORDS)}." for word in words}}).decode()
+    if '"crossings"' in prompt:
+        ids = re.findall(r"\bc\d+\b", prompt.split("crossing cells", 1)[1].split(" of ", 1)[0])
+        return orjson.dumps({"crossings": dict(zip(ids, _words(len(ids)))), "confidence": 0.9}).decode()
+    if "word-association chain from" in prompt:
+        length = int(re.search(r"exactly (\d+) UNIQUE", prompt).group(1))
+        return orjson.dumps({"words": _words(length), "connections": ["association"] * (length + 1), "confidence": 0.9}).decode()
+    if '"candidates"' in prompt:
+        candidates = [{"word": word, "connection": "association"} for word in _words(5)]
+        return orjson.dumps({"candidates": candidates, "confidence": 0.9}).decode()
+    if '"words"' in prompt:
+        return orjson.dumps({"words": _words(5), "confidence": 0.9}).decode()
+    if "is_valid" in prompt:
+        is_valid = random.random() >= STUB_LLM_INVALID_RATE
+        return orjson.dumps({"is_valid": is_valid, "reason": "Stub verdict", "confidence": 0.9}).decode()
+    if "hint" in prompt:
+        return "A common word you use every day."
+    return random.choice(WORDS)
+
+
+@app.get("/v1/models")
+async def models():
+    return {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model"}, {"id": "gpt-4o", "object": "model"}]}
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = orjson.loads(await request.body())
+    delay = STUB_LLM_LATENCY_MS + random.uniform(-STUB_LLM_JITTER_MS, STUB_LLM_JITTER_MS)
+    await asyncio.sleep(max(0.0, delay) / 1000)
+    if random.random() < STUB_LLM_ERROR_RATE:
+        return Response(status_code=500, content=b'{"error": {"message": "Stub failure"}}', media_type="application/json")
+
+    # Instructions sit in the system message, the call's data in the user message
+    prompt = "\n".join(message["content"] for message in body["messages"])
+    content = _reply(prompt)
+    prompt_tokens = sum(len(m["content"]) for m in body["messages"]) // 4
+    completion_tokens = len(content) // 4 + 1
+    payload = {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4o-mini"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+    }
+    return Response(content=orjson.dumps(payload), media_type="application/json")
+
+
+def main() -> None:
+    global STUB_LLM_LATENCY_MS, STUB_LLM_JITTER_MS, STUB_LLM_ERROR_RATE
+    parser = argparse.ArgumentParser(description="Stub OpenAI-compatible server with configurable latency")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=STUB_LLM_LATENCY_MS)
+    parser.add_argument("--jitter-ms", type=float, default=STUB_LLM_JITTER_MS)
+    parser.add_argument("--error-rate", type=float, default=STUB_LLM_ERROR_RATE)
+    args = parser.parse_args()
+    STUB_LLM_LATENCY_MS, STUB_LLM_JITTER_MS, STUB_LLM_ERROR_RATE = args.latency_ms, args.jitter_ms, args.error_rate
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
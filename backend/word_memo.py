@@ -0,0 +1,118 @@
+import os
+import random
+import sqlite3
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+from word_utils import UsedWords, normalize_word
+
+DEFAULT_MEMO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "word_memo.sqlite3")
+
+
+class WordRelationMemo:
+    """Persistent store of LLM word relations reused across boards.
+
+    Each row records that the model produced next_word for
+    (source_word, connection, category, language, level). Chain steps sample
+    from the store and only go to the LLM for a novelty_ratio share of steps
+    or when the store has nothing unused for the source word.
+    """
+
+    def __init__(self, path: Optional[str] = None, novelty_ratio: Optional[float] = None):
+        if path is None:
+            path = os.getenv("WORD_MEMO_PATH", DEFAULT_MEMO_PATH)
+        if novelty_ratio is None:
+            novelty_ratio = float(os.getenv("WORD_MEMO_NOVELTY", "0.3"))
+
+        self.path = path
+        self.novelty_ratio = min(max(novelty_ratio, 0.0), 1.0)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS relations (
+                source TEXT NOT NULL,
+                language TEXT NOT NULL,
+                level TEXT NOT NULL,
+                category TEXT NOT NULL,
+                connection TEXT NOT NULL,
+                next_word TEXT NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 1,
+                PRIMARY KEY (source, language, level, category, connection, next_word)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def _key(self, source_word: str, category: Optional[str], language: Optional[str], language_level: Optional[str]) -> tuple:
+        return (
+            normalize_word(source_word, language),
+            (language or "").lower(),
+            (language_level or "").upper(),
+            (category or "").lower(),
+        )
+
+    def should_explore(self) -> bool:
+        """Whether this step should ask the LLM for something new instead of reusing the memo"""
+        return random.random() < self.novelty_ratio
+
+    def record(
+        self,
+        source_word: str,
+        connection: str,
+        category: Optional[str],
+        language: Optional[str],
+        language_level: Optional[str],
+        next_words: Iterable[str]
+    ) -> None:
+        """Store next_words as relations of source_word"""
+        key = self._key(source_word, category, language, language_level)
+        rows = [key + (connection.strip().lower(), word) for word in next_words if word]
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.executemany("""
+                INSERT INTO relations (source, language, level, category, connection, next_word)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source, language, level, category, connection, next_word) DO UPDATE SET hits = hits + 1
+            """, rows)
+            self._conn.commit()
+
+    def sample(
+        self,
+        source_word: str,
+        connection_types: Optional[List[str]],
+        category: Optional[str],
+        language: Optional[str],
+        language_level: Optional[str],
+        used_words: UsedWords
+    ) -> Optional[Tuple[str, str]]:
+        """Pick a remembered (word, connection) for source_word that is not in used_words"""
+        key = self._key(source_word, category, language, language_level)
+        query = """
+            SELECT next_word, connection, hits FROM relations
+            WHERE source = ? AND language = ? AND level = ? AND category = ?
+        """
+        params = list(key)
+        labels = {}
+        if connection_types:
+            # Hand back the caller's own spelling of the connection label
+            labels = {c.strip().lower(): c for c in connection_types}
+            query += f" AND connection IN ({', '.join('?' * len(labels))})"
+            params.extend(labels)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        rows = [row for row in rows if normalize_word(row[0], language) not in used_words]
+        if not rows:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        # Relations the model produced more often are more likely to be good ones
+        word, connection, _ = random.choices(rows, weights=[row[2] for row in rows])[0]
+        return word, labels.get(connection, connection)
@@ -0,0 +1,95 @@
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+# Plural rules used to fold inflections onto a common key. Only plurals are
+# folded: stripping -ing/-ed breaks stems ('evening' -> 'even', 'indeed' -> 'inde').
+# Ordered longest first; each rule is (suffix, replacement, min_stem_length).
+INFLECTION_RULES = [
+    ("ies", "y", 3),
+    ("sses", "ss", 2),
+    ("ches", "ch", 2),
+    ("shes", "sh", 2),
+    ("xes", "x", 2),
+    ("es", "e", 3),
+    ("s", "", 3),
+]
+# Endings of singular words that look like a plural -s ('this', 'bus', 'famous', 'glass')
+SINGULAR_ENDINGS = ("ss", "is", "us", "ous", "ics")
+# Words that end like a plural but are not the plural of a shorter word
+UNFOLDED_WORDS = frozenset({
+    "news", "species", "series", "means", "lens", "always", "perhaps", "sometimes",
+    "whereas", "besides", "towards", "afterwards", "pants", "trousers", "scissors",
+    "clothes", "alms", "measles", "headquarters", "goods", "thanks", "woods", "arms",
+})
+
+
+def strip_accents(word: str) -> str:
+    """Remove diacritics ('café' -> 'cafe')"""
+    decomposed = unicodedata.normalize("NFKD", word)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def normalize_word(word: str, language: Optional[str] = "English") -> str:
+    """Fold case, accents and simple inflections so 'Cats', 'cat' and 'càt' compare equal"""
+    key = strip_accents(word.strip().casefold())
+
+    # Inflection folding is only reliable for English-like suffixes
+    if language and language.lower() != "english":
+        return key
+
+    if key in UNFOLDED_WORDS or key.endswith(SINGULAR_ENDINGS):
+        return key
+    for suffix, replacement, min_stem in INFLECTION_RULES:
+        if key.endswith(suffix) and len(key) - len(suffix) >= min_stem:
+            return key[: len(key) - len(suffix)] + replacement
+    return key
+
+
+class UsedWords(Dict[str, str]):
+    """Words already on a board, keyed by normalize_word.
+
+    Membership is tested with normalized keys; the values keep the words as
+    they were placed, in placement order, which is what prompts show the model.
+    """
+
+    def __init__(self, language: Optional[str] = "English", words: Iterable[str] = ()):
+        super().__init__()
+        self.language = language
+        for word in words:
+            self.add(word)
+
+    def key(self, word: str) -> str:
+        return normalize_word(word, self.language)
+
+    def add(self, word: str) -> None:
+        self.setdefault(self.key(word), word)
+
+    def discard(self, word: str) -> None:
+        self.pop(self.key(word), None)
+
+    def copy(self) -> "UsedWords":
+        used = UsedWords(self.language)
+        used.update(self)
+        return used
+
+    def recent(self, limit: int) -> List[str]:
+        """The last limit words placed (nearest the chain being grown), sorted so the same selection always reads the same"""
+        return sorted(list(self.values())[-limit:]) if limit > 0 else []
+
+
+def clean_word(raw: str) -> str:
+    """Reduce an LLM reply to a single lowercase word"""
+    word = str(raw).strip().strip(".,;:!?\"'").lower()
+    return word.split()[0] if word else ""
+
+
+def clean_words(raw_words: Iterable[str]) -> List[str]:
+    """Clean a ranked list of candidates, dropping blanks and duplicates"""
+    seen = set()
+    words = []
+    for raw in raw_words:
+        word = clean_word(raw)
+        if word and word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words